@@ -0,0 +1 @@
+"""離線效能基準測試：以假的 yt-dlp / spotdl / ffmpeg 與本機限速 HTTP 伺服器量測下載佇列"""
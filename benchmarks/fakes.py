@@ -0,0 +1,335 @@
+"""假的 yt-dlp / spotdl / ffmpeg：輸出格式與參數和真正的工具相容，內容從本機媒體伺服器下載
+
+行為由環境變數控制 (基準測試的各情境會設定)：
+BENCH_STARTUP_SECONDS  每次啟動工具的固定成本 (模擬直譯器與 extractor 載入)
+BENCH_EXTRACT_SECONDS  yt-dlp 擷取網頁與格式的延遲 (使用 --load-info-json 時不會發生)
+BENCH_SEARCH_SECONDS   spotdl 搜尋 YouTube 來源的延遲 (歌曲帶有 download_url 時不會發生)
+BENCH_FFMPEG_CPU_PER_MIB  ffmpeg 每 MiB 的 CPU 時間 (以實際運算消耗 CPU)
+BENCH_SERVER / BENCH_TRACK_SIZE / BENCH_TRACK_RATE / BENCH_ALBUM_TRACKS  spotdl 使用的媒體伺服器與歌曲設定
+"""
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# yt-dlp 中需要值的選項 (其餘視為旗標)
+YT_DLP_VALUE_OPTIONS = {
+    '-o', '-f', '-N', '--audio-format', '--audio-quality', '--remux-video', '--recode-video',
+    '--merge-output-format', '--download-archive', '--load-info-json', '--limit-rate', '--ffmpeg-location',
+    '--proxy',
+}
+SPOTDL_VALUE_OPTIONS = {'--output', '--threads', '--yt-dlp-args', '--save-file', '--archive'}
+READ_CHUNK = 64 * 1024
+
+def env_float(name, default=0.0):
+    return float(os.environ.get(name, default))
+
+def parse_args(argv, value_options):
+    """回傳 ({選項: [值...]}, [位置參數])"""
+    options = {}
+    positional = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in value_options:
+            options.setdefault(arg, []).append(argv[i + 1])
+            i += 2
+            continue
+        if arg.startswith('-'):
+            options.setdefault(arg, []).append(True)
+        else:
+            positional.append(arg)
+        i += 1
+    return options, positional
+
+def parse_rate(text):
+    """解析 --limit-rate (純數字為 bytes/s，可帶 K/M/G 後綴)"""
+    text = text.strip().upper().rstrip('B').rstrip('I')
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+def format_mib(num):
+    return f'{num / 1024 ** 2:.2f}MiB'
+
+def fetch(url, path, limit_rate=None, on_progress=None, proxy=None):
+    """下載到 path (已有部分檔案時以 Range 續傳)，回傳總大小；proxy 與 yt-dlp 的 --proxy 相同 (可帶帳號密碼)"""
+    start = os.path.getsize(path) if os.path.exists(path) else 0
+    request = urllib.request.Request(url, headers={'Range': f'bytes={start}-'} if start else {})
+    handlers = [urllib.request.ProxyHandler({'http': proxy, 'https': proxy})] if proxy else []
+    with urllib.request.build_opener(*handlers).open(request) as response, open(path, 'ab') as f:
+        total = start + int(response.headers.get('Content-Length', 0))
+        done = start
+        started = time.monotonic()
+        last_report = 0.0
+        while True:
+            chunk = response.read(READ_CHUNK)
+            if not chunk:
+                break
+            f.write(chunk)
+            done += len(chunk)
+            if limit_rate:
+                delay = started + (done - start) / limit_rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            now = time.monotonic()
+            if on_progress and (now - last_report >= 0.1 or done == total):
+                last_report = now
+                on_progress(done, total, (done - start) / max(now - started, 1e-6))
+    return total
+
+def burn_cpu(seconds):
+    """以實際運算消耗 CPU 時間 (模擬編碼)"""
+    deadline = time.process_time() + seconds
+    digest = b''
+    while time.process_time() < deadline:
+        digest = hashlib.sha256(digest + b'x' * 4096).digest()
+
+# --- yt-dlp ---
+def media_info(url):
+    """依媒體網址的查詢參數產生 yt-dlp 格式的資訊 JSON"""
+    parts = urllib.parse.urlsplit(url)
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    media_id = parts.path.rsplit('/', 1)[-1]
+    vcodec = query.get('vcodec', 'avc1.640028')
+    acodec = query.get('acodec', 'mp4a.40.2')
+    ext = 'webm' if vcodec.startswith(('vp', 'av01')) else 'mp4'
+    return {
+        'id': media_id, 'title': media_id, 'uploader': 'bench', 'ext': ext,
+        'webpage_url': url, 'url': url, 'extractor': 'generic', 'extractor_key': 'Generic',
+        'filesize': int(query.get('size', 0)),
+        'requested_formats': [{'vcodec': vcodec, 'acodec': 'none'}, {'vcodec': 'none', 'acodec': acodec}],
+    }
+
+def playlist_info(url):
+    """/playlist?list=<名稱>&n=<項目數>&size=..&rate=.. 扁平解析的結果"""
+    parts = urllib.parse.urlsplit(url)
+    query = dict(urllib.parse.parse_qsl(parts.query))
+    base = f'{parts.scheme}://{parts.netloc}'
+    extra = {k: v for k, v in query.items() if k not in ('list', 'n')}
+    entries = []
+    for i in range(1, int(query.get('n', 10)) + 1):
+        media_id = f"{query.get('list', 'pl')}-{i:04d}"
+        entry_url = f'{base}/media/{media_id}?{urllib.parse.urlencode(extra)}'
+        entries.append({'_type': 'url', 'ie_key': 'Generic', 'id': media_id, 'url': entry_url, 'title': media_id})
+    return {'_type': 'playlist', 'id': query.get('list', 'pl'), 'title': query.get('list', 'pl'), 'entries': entries}
+
+def render_template(template, info, ext):
+    path = template
+    for field, value in (('playlist_index', 'NA'), ('uploader', info['uploader']), ('title', info['title']),
+                         ('id', info['id']), ('ext', ext)):
+        path = path.replace(f'%({field})s', str(value))
+    return path
+
+def fake_yt_dlp(argv):
+    options, positional = parse_args(argv, YT_DLP_VALUE_OPTIONS)
+    time.sleep(env_float('BENCH_STARTUP_SECONDS'))
+    if '--load-info-json' in options:
+        with open(options['--load-info-json'][0], encoding='utf-8') as f:
+            info = json.load(f)
+    else:
+        url = positional[-1]
+        time.sleep(env_float('BENCH_EXTRACT_SECONDS'))
+        info = playlist_info(url) if '/playlist' in url else media_info(url)
+    if info.get('_type') != 'playlist':
+        # 與 yt-dlp 相同，在資訊中記錄所選的格式 ID (-J 的輸出與 --write-info-json 寫出的檔案)
+        audio_only = '-x' in options or (options.get('-f') or [''])[0].startswith('bestaudio')
+        info['format_id'] = '251' if audio_only else '137+140'
+    if '-J' in options:
+        print(json.dumps(info))
+        return 0
+    if info.get('_type') == 'playlist':
+        # 未展開的播放清單：逐項下載 (與 yt-dlp 相同，依序處理)
+        for entry in info['entries']:
+            code = download_media(media_info(entry['url']), options)
+            if code:
+                return code
+        return 0
+    return download_media(info, options)
+
+def download_media(info, options):
+    archive_path = (options.get('--download-archive') or [None])[0]
+    archive_line = f"generic {info['id']}"
+    if archive_path and os.path.exists(archive_path):
+        with open(archive_path, encoding='utf-8') as f:
+            if archive_line in (line.strip() for line in f):
+                print(f"[download] {info['id']} has already been recorded in the archive", flush=True)
+                return 0
+    templates = options.get('-o', [])
+    media_template = next((t for t in templates if not t.startswith('infojson:')), '%(title)s.%(ext)s')
+    for template in templates:
+        if template.startswith('infojson:'):
+            with open(render_template(template[len('infojson:'):], info, 'info') + '.info.json', 'w', encoding='utf-8') as f:
+                json.dump(info, f)
+    audio_only = '-x' in options or (options.get('-f') or [''])[0].startswith('bestaudio')
+    source_ext = 'webm' if audio_only else (options.get('--merge-output-format') or [info['ext']])[0]
+    path = render_template(media_template, info, source_ext)
+    if not os.path.exists(path):
+        limit = (options.get('--limit-rate') or [None])[0]
+
+        def report(done, total, speed):
+            eta = int((total - done) / speed) if speed else 0
+            print(f"[download] {done * 100 / total:5.1f}% of {format_mib(total)} at {format_mib(speed)}/s "
+                  f"ETA {eta // 60:02d}:{eta % 60:02d}", flush=True)
+
+        try:
+            fetch(info['url'], path + '.part', parse_rate(limit) if limit else None, report,
+                  (options.get('--proxy') or [None])[0])
+        except urllib.error.HTTPError as e:
+            # 與 yt-dlp 相同的錯誤格式 (網站限流時為 HTTP Error 429: Too Many Requests)
+            print(f"ERROR: [generic] {info['id']}: Unable to download video data: HTTP Error {e.code}: {e.reason}",
+                  file=sys.stderr, flush=True)
+            return 1
+        os.replace(path + '.part', path)
+    ffmpeg = (options.get('--ffmpeg-location') or ['ffmpeg'])[0]
+    stem = os.path.splitext(path)[0]
+    if '-x' in options:
+        target = f"{stem}.{options['--audio-format'][0]}"
+        subprocess.run([ffmpeg, '-y', '-i', path, '-vn', target], check=True)
+        os.remove(path)
+    elif '--recode-video' in options:
+        target = f"{stem}.{options['--recode-video'][0]}"
+        subprocess.run([ffmpeg, '-y', '-i', path, target + '.tmp'], check=True)
+        os.remove(path)
+        os.replace(target + '.tmp', target)
+    elif '--remux-video' in options:
+        os.replace(path, f"{stem}.{options['--remux-video'][0]}")
+    if archive_path:
+        with open(archive_path, 'a', encoding='utf-8') as f:
+            f.write(archive_line + '\n')
+    return 0
+
+# --- ffmpeg ---
+def fake_ffmpeg(argv):
+    source = argv[argv.index('-i') + 1]
+    target = argv[-1]
+    time.sleep(env_float('BENCH_STARTUP_SECONDS') / 4)
+    size = os.path.getsize(source)
+    burn_cpu(size / 1024 ** 2 * env_float('BENCH_FFMPEG_CPU_PER_MIB'))
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        while True:
+            chunk = src.read(READ_CHUNK * 16)
+            if not chunk:
+                break
+            dst.write(chunk)
+    return 0
+
+# --- spotdl ---
+def spotify_songs(query):
+    """依 Spotify 網址 (或 .spotdl 檔) 產生歌曲資料"""
+    if query.endswith('.spotdl'):
+        with open(query, encoding='utf-8') as f:
+            return json.load(f)
+    parts = urllib.parse.urlsplit(query).path.strip('/').split('/')
+    kind, item_id = parts[-2], parts[-1]
+    if kind == 'track':
+        track_ids = [item_id]
+    else:
+        track_ids = [f'{item_id}t{i:02d}' for i in range(int(os.environ.get('BENCH_ALBUM_TRACKS', 10)))]
+    return [{'song_id': track_id, 'name': f'Song {track_id}', 'artists': ['Bench'], 'artist': 'Bench',
+             'url': f'https://open.spotify.com/track/{track_id}', 'download_url': None} for track_id in track_ids]
+
+def fake_spotdl(argv):
+    operation, rest = argv[0], argv[1:]
+    options, positional = parse_args(rest, SPOTDL_VALUE_OPTIONS)
+    time.sleep(env_float('BENCH_STARTUP_SECONDS'))
+    save_file = (options.get('--save-file') or [None])[0]
+    songs = [song for query in positional for song in spotify_songs(query)]
+    if operation == 'save':
+        with open(save_file, 'w', encoding='utf-8') as f:
+            json.dump(songs, f)
+        return 0
+    print(f'Found {len(songs)} songs in Bench (Album)', flush=True)
+    archive_path = (options.get('--archive') or [None])[0]
+    archived = set()
+    if archive_path and os.path.exists(archive_path):
+        with open(archive_path, encoding='utf-8') as f:
+            archived = {line.strip() for line in f}
+    template = (options.get('--output') or ['{artist} - {title}.{ext}'])[0]
+    server = os.environ['BENCH_SERVER']
+    size = int(os.environ.get('BENCH_TRACK_SIZE', 256 * 1024))
+    rate = int(os.environ.get('BENCH_TRACK_RATE', 0))
+    # --yt-dlp-args 中的 --proxy (spotdl 交給 yt-dlp 的參數)
+    yt_dlp_args = ' '.join(options.get('--yt-dlp-args', [])).split()
+    proxy = yt_dlp_args[yt_dlp_args.index('--proxy') + 1] if '--proxy' in yt_dlp_args else None
+    lock = threading.Lock()
+
+    def download(song):
+        if song['url'] in archived:
+            with lock:
+                print(f"Skipping {song['name']} (already downloaded)", flush=True)
+            return
+        if not song.get('download_url'):
+            time.sleep(env_float('BENCH_SEARCH_SECONDS')) # 搜尋來源
+            song['download_url'] = f"{server}/media/{song['song_id']}?size={size}&rate={rate}"
+        path = template.replace('{artist}', song['artist']).replace('{title}', song['name']).replace('{ext}', 'mp3')
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+        fetch(song['download_url'], path + '.part', proxy=proxy)
+        burn_cpu(size / 1024 ** 2 * env_float('BENCH_FFMPEG_CPU_PER_MIB'))
+        os.replace(path + '.part', path)
+        with lock:
+            print(f"Downloaded \"{song['artist']} - {song['name']}\": {song['download_url']}", flush=True)
+            if archive_path:
+                with open(archive_path, 'a', encoding='utf-8') as f:
+                    f.write(song['url'] + '\n')
+
+    with ThreadPoolExecutor(max_workers=int((options.get('--threads') or ['4'])[0])) as pool:
+        list(pool.map(download, songs))
+    if save_file:
+        with open(save_file, 'w', encoding='utf-8') as f:
+            json.dump(songs, f)
+    return 0
+
+FAKE_TOOLS = {'yt-dlp': fake_yt_dlp, 'spotdl': fake_spotdl, 'ffmpeg': fake_ffmpeg}
+
+# --- 工具探查 (版本與功能清單的輸出格式與真正的工具相同) ---
+FAKE_VERSIONS = {'yt-dlp': '2099.01.01', 'spotdl': '4.2.0',
+                 'ffmpeg': 'ffmpeg version 6.1-bench Copyright (c) 2000-2099 the FFmpeg developers'}
+FAKE_YT_DLP_FLAGS = ('-x', '-J', '--flat-playlist', '--newline', '--no-warnings', '--no-playlist',
+                     '--write-info-json', '--no-write-playlist-metafiles', '--no-part', '--quiet')
+FAKE_ENCODERS = ('A..... libmp3lame', 'A..... aac', 'A..... flac', 'V..... libx264', 'V..... libvpx-vp9')
+FAKE_MUXERS = ('  E mp3', '  E adts', 'DE flac', '  E mp4', '  E mov', ' E webm')
+
+def probe_response(tool, argv):
+    """回應 --version / --help / -encoders / -muxers，其他參數回傳 None"""
+    if argv[-1:] in (['--version'], ['-version']):
+        return FAKE_VERSIONS[tool]
+    if tool == 'yt-dlp' and argv == ['--help']:
+        return '\n'.join(f'    {option}' for option in sorted(YT_DLP_VALUE_OPTIONS) + list(FAKE_YT_DLP_FLAGS))
+    if tool == 'spotdl' and argv == ['download', '--help']:
+        return '\n'.join(f'  {option}' for option in sorted(SPOTDL_VALUE_OPTIONS))
+    if tool == 'ffmpeg' and argv[-1:] in (['-encoders'], ['-muxers']):
+        rows = FAKE_ENCODERS if argv[-1] == '-encoders' else FAKE_MUXERS
+        return '\n'.join(['Codecs:', ' ------'] + [f' {row:<24}fake' for row in rows])
+    return None
+
+def main(tool, argv):
+    response = probe_response(tool, argv)
+    if response is not None:
+        print(response)
+        return 0
+    return FAKE_TOOLS[tool](argv)
+
+def install_fake_tools(directory):
+    """在 directory 建立可執行的假工具 (以目前的 Python 直譯器執行本模組)"""
+    os.makedirs(directory, exist_ok=True)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for tool in FAKE_TOOLS:
+        path = os.path.join(directory, tool)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'#!{sys.executable}\n'
+                    f'import sys\n'
+                    f'sys.path.insert(0, {root!r})\n'
+                    f'from benchmarks.fakes import main\n'
+                    f'sys.exit(main({tool!r}, sys.argv[1:]))\n')
+        os.chmod(path, 0o755)
+    return directory
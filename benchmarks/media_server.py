@@ -0,0 +1,140 @@
+"""本機媒體伺服器：依查詢參數提供指定大小與速率的內容 (支援 Range 續傳)
+
+指定 max_streams 時模擬會限流的網站：同時傳送的串流超過上限時回應 HTTP 429。
+"""
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 每次寫入的區塊大小與預設速率 (bytes/s，0 表示不限速)
+CHUNK_SIZE = 64 * 1024
+DEFAULT_RATE = 0
+
+def media_bytes(name, start, length):
+    """產生可重現的內容 (依名稱與位移決定)，續傳後的檔案與一次下載的完全相同"""
+    seed = sum(name.encode('utf-8')) % 251
+    return bytes((seed + i) % 251 for i in range(start, start + length))
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    """GET /media/<name>?size=<bytes>&rate=<bytes/s>"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        if not parts.path.startswith('/media/'):
+            self.send_error(404)
+            return
+        if not self.server.open_stream():
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        try:
+            self.send_media(parts)
+        finally:
+            self.server.close_stream()
+
+    def send_media(self, parts):
+        query = urllib.parse.parse_qs(parts.query)
+        name = parts.path[len('/media/'):]
+        size = int(query.get('size', ['0'])[0])
+        rate = int(query.get('rate', [str(DEFAULT_RATE)])[0])
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and range_header.startswith('bytes='):
+            start = min(size, int(range_header[len('bytes='):].split('-')[0] or 0))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{size - 1}/{size}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size - start))
+        self.end_headers()
+        # 依速率分段送出：以開始時間計算每個區塊應送出的時間點，避免累積誤差
+        started = time.monotonic()
+        sent = 0
+        block = media_bytes(name, 0, CHUNK_SIZE + 251)
+        while start + sent < size:
+            length = min(CHUNK_SIZE, size - start - sent)
+            offset = (start + sent) % 251
+            try:
+                self.wfile.write(block[offset:offset + length])
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            sent += length
+            self.server.count_bytes(length)
+            if rate:
+                delay = started + sent / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def log_message(self, format, *args):
+        pass # 基準測試時不輸出存取紀錄
+
+
+class CountingHTTPServer(ThreadingHTTPServer):
+    """記錄送出的內容總量 (量測實際的網路傳輸量) 與因限流拒絕的請求數"""
+
+    def __init__(self, *args, max_streams=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes_served = 0
+        self.max_streams = max_streams
+        self.streams = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def count_bytes(self, length):
+        with self._lock:
+            self.bytes_served += length
+
+    def open_stream(self):
+        """開始傳送一個串流；已達 max_streams 時回傳 False (應回應 429)"""
+        with self._lock:
+            if self.max_streams and self.streams >= self.max_streams:
+                self.throttled += 1
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self):
+        with self._lock:
+            self.streams -= 1
+
+
+class MediaServer:
+    """在背景執行緒中執行的本機媒體伺服器 (只綁定 127.0.0.1，不需要網路)"""
+
+    def __init__(self, max_streams=None):
+        self.httpd = CountingHTTPServer(('127.0.0.1', 0), MediaRequestHandler, max_streams=max_streams)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def bytes_served(self):
+        return self.httpd.bytes_served
+
+    @property
+    def throttled(self):
+        return self.httpd.throttled
+
+    def media_url(self, name, size, rate=DEFAULT_RATE, **extra):
+        """組出媒體網址；extra 會成為查詢參數 (例如假 yt-dlp 回報的 vcodec/acodec)"""
+        query = urllib.parse.urlencode(dict(size=size, rate=rate, **extra))
+        return f'{self.base_url}/media/{name}?{query}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,303 @@
+"""執行基準測試情境並把結果存成 JSON (完全離線)
+
+    python -m benchmarks.run                        # 執行所有情境
+    python -m benchmarks.run small_clips --scale 0.2 # 只執行部分情境並縮小規模
+    python -m benchmarks.run --compare old.json     # 與先前的結果比較
+
+每個情境在獨立的子行程中執行，CPU 時間與最大 RSS 不會互相影響。
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE_FILE = os.path.join(ROOT, 'youtube_spotify_downloader.py')
+
+MIB = 1024 ** 2
+
+# 各情境的參數：count 是工作 (或清單項目/專輯) 數，size/rate 是每個檔案的大小與伺服器速率，
+# passes > 1 時以相同的資料夾重複執行 (量測快取的效果；pass_targets 指定每一輪的格式)，env 是假工具的延遲設定，
+# server 是媒體伺服器的設定 (max_streams：同時傳送超過此數的串流時回應 HTTP 429)
+SCENARIOS = {
+    'small_clips': {
+        'description': "many short clips: per-job overhead dominates",
+        'kind': 'media', 'count': 120, 'size': 512 * 1024, 'rate': 4 * MIB,
+        'format_key': 'MP4_VIDEO', 'quality_key': 'HD_720P', 'workers': 8,
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25},
+    },
+    'huge_videos': {
+        'description': "a few large videos that need re-encoding",
+        'kind': 'media', 'count': 3, 'size': 96 * MIB, 'rate': 48 * MIB, 'codecs': ('vp09.00.40.08', 'opus'),
+        'format_key': 'MP4_VIDEO', 'quality_key': 'BEST_VIDEO', 'workers': 3,
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25, 'BENCH_FFMPEG_CPU_PER_MIB': 0.02},
+    },
+    'playlist': {
+        'description': "one playlist converted to MP3",
+        'kind': 'playlist', 'count': 60, 'size': 2 * MIB, 'rate': 8 * MIB,
+        'format_key': 'MP3_AUDIO', 'quality_key': 'BEST_AUDIO', 'workers': 6,
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25, 'BENCH_FFMPEG_CPU_PER_MIB': 0.05},
+    },
+    'spotify_batch': {
+        'description': "Spotify albums, downloaded twice (the second pass reuses cached matches)",
+        'kind': 'spotify', 'count': 4, 'size': 1 * MIB, 'rate': 8 * MIB, 'passes': 2,
+        'format_key': 'MP3_AUDIO', 'quality_key': 'BEST_AUDIO', 'workers': 4,
+        'settings': {'archive': False},
+        'env': {'BENCH_STARTUP_SECONDS': 0.3, 'BENCH_SEARCH_SECONDS': 0.4, 'BENCH_ALBUM_TRACKS': 10,
+                'BENCH_FFMPEG_CPU_PER_MIB': 0.02},
+    },
+    'multi_format': {
+        'description': "each clip converted to three audio formats by one job (one source download)",
+        'kind': 'media', 'count': 20, 'size': 4 * MIB, 'rate': 16 * MIB,
+        'format_key': 'MP3_AUDIO+FLAC_LOSSLESS+AAC_AUDIO', 'quality_key': 'BEST_AUDIO+BEST_AUDIO+BEST_AUDIO',
+        'workers': 4, 'settings': {'archive': False},
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25, 'BENCH_FFMPEG_CPU_PER_MIB': 0.02},
+    },
+    'multi_format_separate': {
+        'description': "the multi_format workload as one job per format (baseline: one download per output)",
+        'kind': 'media', 'count': 20, 'size': 4 * MIB, 'rate': 16 * MIB, 'separate': True,
+        'format_key': 'MP3_AUDIO+FLAC_LOSSLESS+AAC_AUDIO', 'quality_key': 'BEST_AUDIO+BEST_AUDIO+BEST_AUDIO',
+        'workers': 4, 'settings': {'archive': False},
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25, 'BENCH_FFMPEG_CPU_PER_MIB': 0.02},
+    },
+    'reconvert': {
+        'description': "clips converted to MP3, then the same clips to FLAC (the second pass reuses cached sources)",
+        'kind': 'media', 'count': 20, 'size': 4 * MIB, 'rate': 16 * MIB, 'passes': 2,
+        'pass_targets': [('MP3_AUDIO', 'BEST_AUDIO'), ('FLAC_LOSSLESS', 'BEST_AUDIO')], 'workers': 4,
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25, 'BENCH_FFMPEG_CPU_PER_MIB': 0.02},
+    },
+    'reconvert_uncached': {
+        'description': "the reconvert workload without the source cache (baseline: every pass downloads again)",
+        'kind': 'media', 'count': 20, 'size': 4 * MIB, 'rate': 16 * MIB, 'passes': 2,
+        'pass_targets': [('MP3_AUDIO', 'BEST_AUDIO'), ('FLAC_LOSSLESS', 'BEST_AUDIO')], 'workers': 4,
+        'settings': {'source_cache': False},
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25, 'BENCH_FFMPEG_CPU_PER_MIB': 0.02},
+    },
+    'throttled_host': {
+        'description': "more parallel jobs than the site allows: throttled jobs back off and retry",
+        'kind': 'media', 'count': 24, 'size': 2 * MIB, 'rate': 8 * MIB, 'server': {'max_streams': 3},
+        'format_key': 'MP4_VIDEO', 'quality_key': 'HD_720P', 'workers': 8,
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25},
+    },
+    'throttled_host_impolite': {
+        'description': "the throttled_host workload without host politeness (baseline: throttled jobs fail)",
+        'kind': 'media', 'count': 24, 'size': 2 * MIB, 'rate': 8 * MIB, 'server': {'max_streams': 3},
+        'format_key': 'MP4_VIDEO', 'quality_key': 'HD_720P', 'workers': 8,
+        'settings': {'host_politeness': False},
+        'env': {'BENCH_STARTUP_SECONDS': 0.15, 'BENCH_EXTRACT_SECONDS': 0.25},
+    },
+}
+
+def percentile(values, pct):
+    """最近排名法的百分位數 (values 為空時回傳 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+def get_version():
+    """被量測程式的版本：git commit (有的話) 與核心檔案的雜湊"""
+    with open(CORE_FILE, 'rb') as f:
+        version = {'core_sha1': hashlib.sha1(f.read()).hexdigest()[:12]}
+    try:
+        version['git'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                        text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        version['git'] = None
+    return version
+
+def get_rusage():
+    """回傳 (本行程, 子行程) 的 CPU 秒數與最大 RSS (KiB)；不支援 resource 的平台回傳 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux 的 ru_maxrss 單位是 KiB，macOS 是 bytes
+    rss_unit = 1024 if sys.platform == 'darwin' else 1
+    usage = {}
+    for who, key in ((resource.RUSAGE_SELF, 'self'), (resource.RUSAGE_CHILDREN, 'tools')):
+        r = resource.getrusage(who)
+        usage[key] = {'cpu_seconds': round(r.ru_utime + r.ru_stime, 3), 'peak_rss_kib': r.ru_maxrss // rss_unit}
+    return usage
+
+def build_urls(scenario, server, scale):
+    count = max(1, round(scenario['count'] * scale))
+    size = scenario['size']
+    codecs = scenario.get('codecs')
+    extra = {'vcodec': codecs[0], 'acodec': codecs[1]} if codecs else {}
+    if scenario['kind'] == 'media':
+        return [server.media_url(f'clip{i:05d}', size, scenario['rate'], **extra) for i in range(count)]
+    if scenario['kind'] == 'playlist':
+        return [f"{server.base_url}/playlist?list=bench&n={count}&size={size}&rate={scenario['rate']}"]
+    # Spotify：專輯數依比例縮放，每張專輯的曲目數由 BENCH_ALBUM_TRACKS 決定
+    return [f'https://open.spotify.com/album/benchalbum{i:03d}' for i in range(count)]
+
+def run_scenario(name, scale):
+    """在目前的 (子) 行程中執行一個情境並回傳結果"""
+    scenario = SCENARIOS[name]
+    work_dir = tempfile.mkdtemp(prefix=f'bench-{name}-')
+    try:
+        from benchmarks.fakes import install_fake_tools
+        from benchmarks.media_server import MediaServer
+        tools_dir = install_fake_tools(os.path.join(work_dir, 'tools'))
+        shutil.copy(os.path.join(ROOT, 'Downloadable_videos.txt'), tools_dir)
+        server = MediaServer(**scenario.get('server', {})).start()
+        # 下載紀錄、快取與暫存區都放在此情境專屬的資料夾
+        os.environ['XDG_DATA_HOME'] = os.environ['LOCALAPPDATA'] = os.path.join(work_dir, 'data')
+        os.environ['BENCH_SERVER'] = server.base_url
+        os.environ['BENCH_TRACK_SIZE'] = str(scenario['size'])
+        os.environ['BENCH_TRACK_RATE'] = str(scenario['rate'])
+        for key, value in scenario.get('env', {}).items():
+            os.environ[key] = str(value)
+        sys.path.insert(0, ROOT)
+        import youtube_spotify_downloader as core
+        core.APPLICATION_PATH = tools_dir
+        core.DOWNLOAD_SETTINGS.update(scenario.get('settings', {}))
+
+        callbacks = {'status': 0, 'progress': 0}
+
+        def on_status(job, message, color):
+            callbacks['status'] += 1
+
+        def on_progress(job, event):
+            callbacks['progress'] += 1
+
+        urls = build_urls(scenario, server, scale)
+        output_path = os.path.join(work_dir, 'output')
+        # separate: 多格式的工作拆成每種格式一個工作 (每個輸出各自下載來源)
+        if 'pass_targets' in scenario:
+            targets = None
+        elif scenario.get('separate'):
+            targets = core.split_targets(scenario['format_key'], scenario['quality_key'])
+        else:
+            targets = [(scenario['format_key'], scenario['quality_key'])]
+        passes = []
+        for index in range(scenario.get('passes', 1)):
+            if 'pass_targets' in scenario:
+                targets = [scenario['pass_targets'][index]]
+            queue = core.DownloadQueue(max_workers=scenario['workers'], status_callback=on_status,
+                                       progress_callback=on_progress, journal=core.get_job_journal())
+            served_before = server.bytes_served
+            throttled_before = server.throttled
+            started = time.monotonic()
+            queue.submit_many([(url, format_key, quality_key, output_path, 'en')
+                               for url in urls for format_key, quality_key in targets])
+            queue.wait()
+            elapsed = time.monotonic() - started
+            # 播放清單工作只是子工作的容器，延遲只計算實際下載的工作
+            jobs = [job for job in queue.jobs if not job.children]
+            latencies = [job.finished_at - job.submitted_at for job in jobs if job.finished_at]
+            queue.shutdown()
+            track_reports = [job.report['track_cache'] for job in jobs if 'track_cache' in job.report]
+            source_reports = [job.report['source_cache'] for job in jobs if 'source_cache' in job.report]
+            passes.append({
+                'jobs': len(jobs),
+                'done': sum(job.state == core.JOB_DONE for job in jobs),
+                'failed': sum(job.state == core.JOB_FAILED for job in jobs),
+                'seconds': round(elapsed, 3),
+                'served_bytes': server.bytes_served - served_before,
+                'jobs_per_second': round(len(jobs) / elapsed, 3) if elapsed else None,
+                'latency_seconds': {f'p{p}': round(percentile(latencies, p), 3) for p in (50, 90, 99)}
+                                   if latencies else None,
+                'track_cache_hits': sum(r['hits'] for r in track_reports) if track_reports else None,
+                'track_cache_tracks': sum(r['tracks'] for r in track_reports) if track_reports else None,
+                'source_cache_hits': source_reports.count('hit') if source_reports else None,
+                'throttled_responses': server.throttled - throttled_before,
+                'retries': sum(job.report.get('retries', 0) for job in jobs),
+            })
+        server.stop()
+        output_bytes = sum(os.path.getsize(os.path.join(root, f))
+                           for root, _dirs, files in os.walk(output_path) for f in files)
+        return {
+            'description': scenario['description'],
+            'scale': scale,
+            'passes': passes,
+            'output_bytes': output_bytes,
+            'callbacks': callbacks,
+            'rusage': get_rusage(),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_in_subprocess(name, scale):
+    result = subprocess.run([sys.executable, '-m', 'benchmarks.run', '--child', name, '--scale', str(scale)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': result.stderr.strip()[-2000:]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def print_summary(results, baseline=None):
+    """輸出每個情境的主要數據；有基準結果時一併顯示變化比例"""
+    for name, result in results['scenarios'].items():
+        if 'error' in result:
+            print(f"{name}: ERROR\n{result['error']}")
+            continue
+        for index, current in enumerate(result['passes']):
+            line = (f"{name}[{index}]: {current['done']}/{current['jobs']} done in {current['seconds']}s "
+                    f"({current['jobs_per_second']} jobs/s)")
+            if current['latency_seconds']:
+                line += ' latency ' + ' '.join(f'{k}={v}s' for k, v in current['latency_seconds'].items())
+            line += f" served {current['served_bytes'] / MIB:.1f} MiB"
+            if current['track_cache_tracks']:
+                line += f" track cache {current['track_cache_hits']}/{current['track_cache_tracks']}"
+            if current.get('source_cache_hits'):
+                line += f" source cache {current['source_cache_hits']} hits"
+            if current.get('throttled_responses'):
+                line += f" {current['throttled_responses']} throttled responses, {current['retries']} retries"
+            old = ((baseline or {}).get('scenarios', {}).get(name) or {}).get('passes') or []
+            if index < len(old) and old[index].get('seconds'):
+                line += f" [{current['seconds'] / old[index]['seconds']:.2f}x baseline time]"
+            print(line)
+        if result['rusage']:
+            usage = result['rusage']
+            print(f"  cpu {usage['self']['cpu_seconds']}s (tools {usage['tools']['cpu_seconds']}s), "
+                  f"peak rss {usage['self']['peak_rss_kib']} KiB (tools {usage['tools']['peak_rss_kib']} KiB)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the download queue.")
+    parser.add_argument('scenarios', nargs='*',
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply job counts (default: 1.0)")
+    parser.add_argument('--output', help="result JSON path (default: benchmark-<timestamp>.json)")
+    parser.add_argument('--compare', metavar='JSON', help="earlier result file to compare against")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args.scale)))
+        return 0
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    results = {
+        'version': get_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': {},
+    }
+    for name in names:
+        print(f"running {name}...", flush=True)
+        results['scenarios'][name] = run_in_subprocess(name, args.scale)
+    output = args.output or time.strftime('benchmark-%Y%m%d-%H%M%S.json')
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_summary(results, baseline)
+    print(f"results written to {output}")
+    return 1 if any('error' in r or any(p['failed'] for p in r['passes']) for r in results['scenarios'].values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
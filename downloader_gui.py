@@ -0,0 +1,474 @@
+import queue
+import sys
+import threading
+import time
+
+import customtkinter as ctk
+
+from youtube_spotify_downloader import (
+    LANGUAGE_NAMES,
+    DEFAULT_MAX_WORKERS,
+    STARTUP_BUDGET_SECONDS,
+    STARTUP_STARTED_AT,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_CANCELLED,
+    DownloadQueue,
+    detect_system_language,
+    format_bytes,
+    get_default_download_path,
+    get_job_journal,
+    get_metrics_recorder,
+    get_texts,
+    get_tool_registry,
+    get_url_router,
+)
+
+# --- 圖形介面 (僅在啟動 GUI 時才載入 customtkinter) ---
+# 重繪間隔 (毫秒)：工作執行緒的更新先累積起來，每個畫格只繪製一次最新狀態
+GUI_FRAME_MS = 50
+# 工作清單顯示的列數：只建立這些列的元件，捲動時更換內容，不論佇列中有多少工作
+JOB_LIST_ROWS = 8
+# 工作清單每列顯示的網址/訊息最大字元數
+JOB_ROW_TEXT_CHARS = 70
+JOB_STATE_ICONS = {
+    JOB_PENDING: "⏳",
+    JOB_RUNNING: "⬇",
+    JOB_DONE: "✅",
+    JOB_FAILED: "❌",
+    JOB_CANCELLED: "⏹️",
+}
+JOB_STATE_COLORS = {JOB_RUNNING: "blue", JOB_DONE: "green", JOB_FAILED: "red"}
+
+def shorten(text, limit=JOB_ROW_TEXT_CHARS):
+    """只取第一行，超過長度時以 … 截斷"""
+    text = text.strip().split('\n', 1)[0]
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def format_progress(job, event):
+    """進度事件的顯示文字：百分比、項目數、速度、剩餘時間與分段連線數"""
+    parts = []
+    if event.get('percent') is not None:
+        parts.append(f"{event['percent']:.1f}%")
+    if event.get('items_total'):
+        parts.append(f"{event['items_done']}/{event['items_total']}")
+    if event.get('speed'):
+        parts.append(f"{format_bytes(event['speed'])}/s")
+    if event.get('eta') is not None:
+        parts.append(f"ETA {event['eta'] // 60}:{event['eta'] % 60:02d}")
+    if job.report.get('fragments'):
+        parts.append(f"N={job.report['fragments']}")
+    return " · ".join(parts)
+
+def format_job_row(job):
+    """工作清單的一列：狀態、編號、進度 (執行中) 或最新訊息，以及網址"""
+    text = f"{JOB_STATE_ICONS.get(job.state, '')} #{job.job_id}"
+    if job.state == JOB_RUNNING and job.progress:
+        text += f"  {format_progress(job, job.progress)}"
+    elif job.state != JOB_PENDING and job.message:
+        text += f"  {shorten(job.message, JOB_ROW_TEXT_CHARS // 2)}"
+    return f"{text}  {shorten(job.url)}"
+
+class DownloaderApp(ctk.CTk):
+    
+    def __init__(self):
+        super().__init__()
+
+        # 嘗試偵測系統語言並設定預設語言
+        self.current_lang = self.detect_system_language()
+        # 只載入偵測到的語言，其他語言在切換時才讀取
+        texts = get_texts(self.current_lang) # 初始化文本資料
+        
+        # 主要設定
+        self.title(texts['title'])
+        self.geometry("600x760")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(10, weight=1) # 讓工作清單佔據剩餘空間
+
+        # 狀態變數
+        self.output_dir = get_default_download_path()
+        self.current_format_key = 'MP3_AUDIO'
+        self.current_quality_key = 'BEST_AUDIO'
+        
+        # 1. 語言選擇
+        self.lang_frame = ctk.CTkFrame(self)
+        self.lang_frame.grid(row=0, column=0, padx=20, pady=(20, 10), sticky="ew")
+        self.lang_frame.grid_columnconfigure(0, weight=1)
+        
+        self.lang_label = ctk.CTkLabel(self.lang_frame, text="", anchor="w")
+        self.lang_label.grid(row=0, column=0, padx=(0, 10), pady=(0, 5), sticky="w")
+        
+        self.lang_combobox = ctk.CTkComboBox(
+            self.lang_frame, 
+            values=list(LANGUAGE_NAMES.values()), 
+            command=self.change_language_callback
+        )
+        self.lang_combobox.grid(row=0, column=1, sticky="e")
+
+        # 2. URL 輸入 (Row 1, 2)
+        self.url_label = ctk.CTkLabel(self, text="")
+        self.url_label.grid(row=1, column=0, padx=20, pady=(10, 5), sticky="w")
+        
+        self.url_entry = ctk.CTkEntry(self, placeholder_text="Enter URL here...")
+        self.url_entry.grid(row=2, column=0, padx=20, pady=5, sticky="ew")
+
+        # 3. 格式選擇 (Row 3, 4)
+        self.format_label = ctk.CTkLabel(self, text="")
+        self.format_label.grid(row=3, column=0, padx=20, pady=(10, 5), sticky="w")
+        
+        # 格式的值會在 change_language 中初始化
+        self.format_combobox = ctk.CTkComboBox(
+            self, 
+            values=[], # 初始為空，待 change_language 填充
+            command=self.format_changed_callback
+        )
+        self.format_combobox.grid(row=4, column=0, padx=20, pady=5, sticky="ew")
+
+        # 4. 畫質/音質選擇 (Row 5, 6)
+        self.quality_label = ctk.CTkLabel(self, text="")
+        self.quality_label.grid(row=5, column=0, padx=20, pady=(10, 5), sticky="w")
+        
+        # 畫質的值會在 change_language 中初始化
+        self.quality_combobox = ctk.CTkComboBox(self, values=[])
+        self.quality_combobox.grid(row=6, column=0, padx=20, pady=5, sticky="ew")
+
+        # 5. 輸出路徑顯示與選擇 (Row 7)
+        self.path_frame = ctk.CTkFrame(self)
+        self.path_frame.grid(row=7, column=0, padx=20, pady=(15, 5), sticky="ew")
+        self.path_frame.grid_columnconfigure(0, weight=1)
+        self.path_frame.grid_columnconfigure(1, weight=0)
+        
+        self.output_label = ctk.CTkLabel(self.path_frame, text="", anchor="w", justify="left")
+        self.output_label.grid(row=0, column=0, padx=(0, 10), sticky="ew")
+        
+        self.browse_button = ctk.CTkButton(self.path_frame, text="", width=80, command=self.select_output_folder)
+        self.browse_button.grid(row=0, column=1, sticky="e")
+
+        # 6. 下載按鈕 (Row 8)
+        self.download_button = ctk.CTkButton(self, text="", command=self.start_download_thread)
+        self.download_button.grid(row=8, column=0, padx=20, pady=20, sticky="ew")
+
+        # 7. 狀態列 (Row 9)
+        self.status_label = ctk.CTkLabel(self, text="", text_color="gray")
+        self.status_label.grid(row=9, column=0, padx=20, pady=(5, 5), sticky="sw")
+
+        # 8. 工作清單 (Row 10)：固定數量的列加上捲軸，只繪製可見的工作
+        self.jobs_frame = ctk.CTkFrame(self)
+        self.jobs_frame.grid(row=10, column=0, padx=20, pady=5, sticky="nsew")
+        self.jobs_frame.grid_columnconfigure(0, weight=1)
+        self.job_rows = []
+        for index in range(JOB_LIST_ROWS):
+            row = ctk.CTkLabel(self.jobs_frame, text="", anchor="w", justify="left", text_color="gray")
+            row.grid(row=index, column=0, padx=(10, 0), sticky="ew")
+            self.bind_job_list_wheel(row)
+            self.job_rows.append(row)
+        self.job_scrollbar = ctk.CTkScrollbar(self.jobs_frame, command=self.scroll_job_list)
+        self.job_scrollbar.grid(row=0, column=1, rowspan=JOB_LIST_ROWS, sticky="ns")
+        self.bind_job_list_wheel(self.jobs_frame)
+        self.job_list_offset = 0 # 第一個可見列對應的工作位置
+        self.job_list_total = 0
+        self.rendered_rows = [None] * JOB_LIST_ROWS # 每列上次繪製的 (文字, 顏色)，沒變就不重設
+
+        # 9. 佇列摘要 (Row 11)
+        self.queue_label = ctk.CTkLabel(self, text="", text_color="gray")
+        self.queue_label.grid(row=11, column=0, padx=20, pady=(0, 20), sticky="sw")
+
+        # 工作執行緒只把更新記錄在這裡 (不呼叫任何 Tk 方法)，由 render_frame 在主執行緒中以固定頻率統一繪製
+        self.updates_lock = threading.Lock()
+        self.pending_status = None # 最新的 (訊息, 顏色)，較舊的訊息直接被覆蓋
+        self.frame_dirty = False
+
+        # 下載佇列在視窗第一次繪製後才建立 (見 finish_startup)
+        self.download_queue = None
+        # 待加入佇列的網址批次：加入時要探查工具與路由網址，由背景執行緒依序處理，Tk 執行緒不會卡住
+        self.submissions = queue.Queue()
+        self.startup_seconds = None
+        
+        # 初始載入語言
+        self.change_language(self.current_lang)
+
+        # 等事件迴圈閒置 (視窗已顯示) 後再開啟日誌、恢復工作，讓視窗盡早出現
+        self.after_idle(self.after, 0, self.finish_startup)
+        # 畫格迴圈：在主執行緒中每 GUI_FRAME_MS 毫秒檢查一次累積的更新
+        self.after(GUI_FRAME_MS, self.render_frame)
+
+    def finish_startup(self):
+        """視窗顯示後才執行的初始化：建立下載佇列、恢復未完成的工作並記錄啟動時間"""
+        if self.download_queue is not None:
+            return
+        self.startup_seconds = time.perf_counter() - STARTUP_STARTED_AT
+        if self.startup_seconds > STARTUP_BUDGET_SECONDS:
+            print(f"Startup took {self.startup_seconds:.2f}s (budget {STARTUP_BUDGET_SECONDS}s); "
+                  "run with --startup-profile to see the slowest imports", file=sys.stderr)
+
+        # 下載佇列：工作在背景執行緒池中執行，介面可持續加入新網址
+        self.download_queue = DownloadQueue(
+            max_workers=DEFAULT_MAX_WORKERS,
+            status_callback=self.on_job_status,
+            job_callback=self.on_job_update,
+            progress_callback=self.on_job_progress,
+            journal=get_job_journal(),
+            metrics=get_metrics_recorder()
+        )
+        # 外部工具的探查、網址路由的索引與工作的加入都在背景執行緒中進行
+        threading.Thread(target=self.submit_loop, daemon=True).start()
+        self.refresh_queue_summary()
+
+    def warm_up(self):
+        """探查外部工具並載入網址路由，缺少工具時立即提示"""
+        missing = [name for name, info in get_tool_registry().resolve().items() if info is None]
+        get_url_router()
+        if missing:
+            texts = get_texts(self.current_lang)
+            self.update_status(f"{texts['status_error_not_found']} ({', '.join(missing)})", "red")
+
+    def submit_loop(self):
+        """背景執行緒：預先載入工具與路由、恢復上次未完成的工作，之後依序加入使用者輸入的網址"""
+        self.warm_up()
+        # 恢復上次中斷時未完成的工作 (暫存區中的部分檔案會續傳)
+        restored = self.download_queue.restore_from_journal()
+        if restored:
+            texts = get_texts(self.current_lang)
+            self.update_status(texts['status_jobs_restored'].format(count=len(restored)), "blue")
+        while True:
+            entries = self.submissions.get()
+            try:
+                self.download_queue.submit_many(entries)
+            except Exception as e:
+                self.update_status(str(e), "red")
+            self.request_frame()
+
+    def detect_system_language(self):
+        """偵測系統語言，沒有對應的翻譯時使用繁體中文"""
+        return detect_system_language()
+
+    def get_key_from_display(self, display_name, options_dict):
+        """根據顯示名稱反查選項的內部 KEY"""
+        for key, name in options_dict.items():
+            if name == display_name:
+                return key
+        # 如果找不到，返回第一個鍵名作為預設值
+        return list(options_dict.keys())[0] if options_dict else ''
+
+    def change_language_callback(self, selection):
+        """當語言下拉選單改變時的處理函式"""
+        # 從顯示名稱反查內部 KEY (不需要載入其他語言的翻譯)
+        for key, display in LANGUAGE_NAMES.items():
+            if display == selection:
+                self.current_lang = key
+                break
+        self.change_language(self.current_lang)
+
+    def change_language(self, lang_key):
+        """根據選擇的語言更新所有介面元素"""
+        texts = get_texts(lang_key)
+        
+        # 設置頂層標題
+        self.title(texts['title'])
+        
+        # 設置語言選單的預設值
+        current_display = texts['lang_display']
+        self.lang_combobox.set(current_display)
+        self.lang_label.configure(text=texts['combobox_lang_label'])
+
+        # 設置格式選項
+        format_options_display = list(texts['options']['formats'].values())
+        self.format_combobox.configure(values=format_options_display)
+        self.format_label.configure(text=texts['format_label'])
+        
+        # 確保選中的是當前語言對應的格式 (使用當前 key 查找新的顯示名稱)
+        current_format_display = texts['options']['formats'].get(self.current_format_key, format_options_display[0])
+        self.format_combobox.set(current_format_display)
+        
+        # 更新畫質選項（並觸發畫質/音質選單的更新）
+        self.format_changed_callback(current_format_display)
+        
+        # 更新其他 UI 元素
+        self.url_label.configure(text=texts['url_label'])
+        self.output_label.configure(text=f"{texts['path_label']} {self.output_dir}")
+        self.browse_button.configure(text=texts['browse_button'])
+        self.download_button.configure(text=texts['download_button'])
+        self.status_label.configure(text=texts['ready_status'], text_color="gray")
+        self.refresh_queue_summary()
+
+    def format_changed_callback(self, selection):
+        """當格式選擇改變時，動態切換畫質/音質選單的內容"""
+        texts = get_texts(self.current_lang)
+        
+        # 根據顯示名稱反查內部 KEY
+        self.current_format_key = self.get_key_from_display(selection, texts['options']['formats'])
+        
+        # 判斷是音頻還是視訊格式
+        is_audio = 'AUDIO' in self.current_format_key or 'LOSSLESS' in self.current_format_key
+        
+        if is_audio:
+            # 設置音頻選項
+            self.quality_label.configure(text=texts['quality_audio_label'])
+            options_dict = texts['options']['audio_qualities']
+            options_display = list(options_dict.values())
+            self.quality_combobox.configure(values=options_display)
+            
+            # 嘗試保持選中原有的音質選項，否則選第一個
+            current_quality_display = texts['options']['audio_qualities'].get(self.current_quality_key)
+            if current_quality_display not in options_display:
+                 current_quality_display = options_display[0]
+            self.quality_combobox.set(current_quality_display)
+            self.current_quality_key = self.get_key_from_display(current_quality_display, options_dict)
+
+        else:
+            # 設置視訊選項
+            self.quality_label.configure(text=texts['quality_video_label'])
+            options_dict = texts['options']['video_qualities']
+            options_display = list(options_dict.values())
+            self.quality_combobox.configure(values=options_display)
+            
+            # 嘗試保持選中原有的畫質選項，否則選第一個
+            current_quality_display = texts['options']['video_qualities'].get(self.current_quality_key)
+            if current_quality_display not in options_display:
+                 current_quality_display = options_display[0]
+            self.quality_combobox.set(current_quality_display)
+            self.current_quality_key = self.get_key_from_display(current_quality_display, options_dict)
+
+    def select_output_folder(self):
+        """開啟資料夾選擇對話框，讓使用者選擇輸出資料夾"""
+        from tkinter import filedialog # 只有選擇資料夾時才需要
+        texts = get_texts(self.current_lang)
+        folder_selected = filedialog.askdirectory(initialdir=self.output_dir, title=texts['path_label'])
+        if folder_selected:
+            self.output_dir = folder_selected
+            self.output_label.configure(text=f"{texts['path_label']} {self.output_dir}")
+            self.update_status(texts['status_path_set'], "blue")
+
+    def update_status(self, message, color="gray"):
+        """更新介面上的狀態訊息 (可由任何執行緒呼叫，下一個畫格才繪製)"""
+        self.request_frame((message, color))
+
+    def request_frame(self, status=None):
+        """記錄有更新 (可由任何執行緒呼叫)；只設定待繪製的狀態，由主執行緒的畫格迴圈繪製"""
+        with self.updates_lock:
+            if status is not None:
+                self.pending_status = status
+            self.frame_dirty = True
+
+    def render_frame(self):
+        """主執行緒的畫格迴圈：有累積的更新時才繪製 (只有最新的狀態訊息與每個工作目前的狀態)，再排程下一個畫格"""
+        with self.updates_lock:
+            status, self.pending_status = self.pending_status, None
+            dirty, self.frame_dirty = self.frame_dirty, False
+        if status:
+            self.status_label.configure(text=status[0], text_color=status[1])
+        if dirty:
+            self.refresh_queue_summary()
+            self.render_job_list()
+        self.after(GUI_FRAME_MS, self.render_frame)
+
+    def on_job_status(self, job, message, color="gray"):
+        """工作狀態訊息 (由工作執行緒呼叫)"""
+        self.update_status(f"[#{job.job_id}] {message}", color)
+
+    def on_job_update(self, job):
+        """工作狀態改變 (由工作執行緒呼叫)"""
+        self.request_frame()
+
+    def on_job_progress(self, job, event):
+        """即時進度 (由工作執行緒呼叫)：工作清單在下一個畫格顯示每個工作最新的進度"""
+        self.request_frame()
+
+    def render_job_list(self):
+        """只繪製目前可見的列，佇列中有幾千個工作時每個畫格的成本仍然固定"""
+        jobs = self.download_queue.snapshot() if self.download_queue is not None else []
+        self.job_list_total = len(jobs)
+        self.job_list_offset = max(0, min(self.job_list_offset, len(jobs) - JOB_LIST_ROWS))
+        for index, row in enumerate(self.job_rows):
+            position = self.job_list_offset + index
+            if position < len(jobs):
+                job = jobs[position]
+                content = (format_job_row(job), JOB_STATE_COLORS.get(job.state, "gray"))
+            else:
+                content = ("", "gray")
+            if content != self.rendered_rows[index]:
+                row.configure(text=content[0], text_color=content[1])
+                self.rendered_rows[index] = content
+        if jobs:
+            self.job_scrollbar.set(self.job_list_offset / len(jobs),
+                                   min(1.0, (self.job_list_offset + JOB_LIST_ROWS) / len(jobs)))
+        else:
+            self.job_scrollbar.set(0.0, 1.0)
+
+    def scroll_job_list(self, action, amount, unit=None):
+        """捲軸的 command：('moveto', 比例) 或 ('scroll', 數量, 'units'/'pages')"""
+        if action == 'moveto':
+            offset = int(float(amount) * self.job_list_total)
+        else:
+            step = JOB_LIST_ROWS if unit == 'pages' else 1
+            offset = self.job_list_offset + int(amount) * step
+        self.job_list_offset = max(0, min(offset, self.job_list_total - JOB_LIST_ROWS))
+        self.render_job_list()
+
+    def bind_job_list_wheel(self, widget):
+        """滑鼠滾輪捲動工作清單 (Windows/macOS 使用 <MouseWheel>，X11 使用 Button-4/5)"""
+        widget.bind("<MouseWheel>", self.on_job_list_wheel)
+        widget.bind("<Button-4>", self.on_job_list_wheel)
+        widget.bind("<Button-5>", self.on_job_list_wheel)
+
+    def on_job_list_wheel(self, event):
+        up = getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0
+        self.scroll_job_list('scroll', -3 if up else 3, 'units')
+
+    def refresh_queue_summary(self):
+        """更新佇列摘要標籤 (含所有執行中工作的總下載速度)"""
+        if self.download_queue is None:
+            return # 佇列尚未建立 (視窗剛顯示)
+        texts = get_texts(self.current_lang)
+        counts = self.download_queue.counts()
+        summary = texts['status_queue_summary'].format(
+            pending=counts[JOB_PENDING], running=counts[JOB_RUNNING],
+            done=counts[JOB_DONE], failed=counts[JOB_FAILED]
+        )
+        if counts[JOB_RUNNING]:
+            summary += f" · ⬇ {format_bytes(self.download_queue.total_speed())}/s"
+        self.queue_label.configure(text=summary)
+
+    def start_download_thread(self):
+        """將輸入的網址加入下載佇列 (可用空白分隔多個網址)，避免 GUI 鎖死"""
+        texts = get_texts(self.current_lang)
+        urls = self.url_entry.get().split()
+        
+        if not urls:
+            self.update_status(texts['error_no_url'], "red")
+            return
+
+        # 獲取當前選中的格式和品質的 KEY
+        current_format_display = self.format_combobox.get()
+        format_options_dict = texts['options']['formats']
+        self.current_format_key = self.get_key_from_display(current_format_display, format_options_dict)
+        
+        current_quality_display = self.quality_combobox.get()
+        is_audio = 'AUDIO' in self.current_format_key or 'LOSSLESS' in self.current_format_key
+
+        if is_audio:
+             quality_options_dict = texts['options']['audio_qualities']
+             self.current_quality_key = self.get_key_from_display(current_quality_display, quality_options_dict)
+        else:
+             quality_options_dict = texts['options']['video_qualities']
+             self.current_quality_key = self.get_key_from_display(current_quality_display, quality_options_dict)
+
+        if self.download_queue is None:
+            self.finish_startup() # 視窗繪製前就按下按鈕時立即建立佇列
+        # 交給背景執行緒加入佇列並立即清空輸入框，讓使用者繼續輸入下一個網址
+        self.submissions.put([
+            (url, self.current_format_key, self.current_quality_key, self.output_dir, self.current_lang) for url in urls
+        ])
+        self.url_entry.delete(0, "end")
+
+
+def run_gui():
+    """建立主視窗並進入 Tk 事件迴圈"""
+    # 使用系統深色模式 (如果有)
+    ctk.set_appearance_mode("System") 
+    ctk.set_default_color_theme("blue") 
+    
+    app = DownloaderApp()
+    app.mainloop()
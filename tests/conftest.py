@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+# 測試直接匯入專案根目錄的模組 (不需要安裝)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import youtube_spotify_downloader as core
+
+
+class FakeClock:
+    """取代 time.monotonic 的可控時鐘，讓排程器的測試不必真的等待"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(core.time, 'monotonic', fake)
+    return fake
+
+
+@pytest.fixture
+def wall_clock(monkeypatch):
+    """取代 time.time (快取的存活時間以實際時間計算)"""
+    fake = FakeClock(1_700_000_000.0)
+    monkeypatch.setattr(core.time, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def settings():
+    """可在單一測試中修改的 DOWNLOAD_SETTINGS (測試結束後還原)"""
+    original = dict(core.DOWNLOAD_SETTINGS)
+    yield core.DOWNLOAD_SETTINGS
+    core.DOWNLOAD_SETTINGS.clear()
+    core.DOWNLOAD_SETTINGS.update(original)
@@ -0,0 +1,138 @@
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from youtube_spotify_downloader import (
+    ApiError, DownloadJob, DownloadServer, JOB_CANCELLED, JOB_PENDING, JobEventHub, parse_submit_request,
+)
+
+BASE = os.path.abspath('/srv/out')
+
+
+class FakeQueue:
+    """記錄提交內容的 DownloadQueue 替身 (不執行任何下載)"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.fail_snapshot = False
+
+    def submit_many(self, entries):
+        jobs = [DownloadJob(*entry) for entry in entries]
+        self.jobs.update((job.job_id, job) for job in jobs)
+        return jobs
+
+    def get_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job):
+        if job.state != JOB_PENDING:
+            return False
+        job.state = JOB_CANCELLED
+        return True
+
+    def snapshot(self, state=None):
+        if self.fail_snapshot:
+            raise RuntimeError('snapshot exploded')
+        return [job for job in self.jobs.values() if state in (None, job.state)]
+
+    def counts(self):
+        return {JOB_PENDING: sum(job.state == JOB_PENDING for job in self.jobs.values())}
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = DownloadServer(FakeQueue(), JobEventHub(), str(tmp_path), port=0, token='secret')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def request(server, method, path, body=None, token='secret', headers=None):
+    host, port = server.httpd.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    headers = dict(headers or {})
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf-8')
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    conn.close()
+    return response.status, payload
+
+
+def test_parse_submit_request_defaults_and_multi_format():
+    assert parse_submit_request({'url': ' https://a/b '}, BASE, 'en') == [
+        ('https://a/b', 'MP3_AUDIO', 'BEST_AUDIO', BASE, 'en')]
+    entries = parse_submit_request({'urls': ['u'], 'format': ['MP4_VIDEO:HD_720P', 'MP3_AUDIO'],
+                                    'output': 'x/y', 'lang': 'ja'}, BASE, 'en')
+    assert entries == [('u', 'MP4_VIDEO+MP3_AUDIO', 'HD_720P+BEST_AUDIO', os.path.join(BASE, 'x', 'y'), 'ja')]
+
+
+@pytest.mark.parametrize('body', [
+    {},
+    {'urls': 'https://a/b'},
+    {'urls': ['https://a/b', 3]},
+    {'urls': [' ']},
+    {'url': 'u', 'format': 5},
+    {'url': 'u', 'format': ['MP3_AUDIO', None]},
+    {'url': 'u', 'format': 'NOPE'},
+    {'url': 'u', 'quality': 720},
+    {'url': 'u', 'lang': ['en']},
+    {'url': 'u', 'lang': 'xx'},
+    {'url': 'u', 'output': {'path': 'x'}},
+    {'url': 'u', 'output': '../elsewhere'},
+    {'url': 'u', 'output': '/etc'},
+])
+def test_parse_submit_request_rejects_malformed_fields(body):
+    with pytest.raises(ApiError) as error:
+        parse_submit_request(body, BASE, 'en')
+    assert error.value.status == 400
+
+
+def test_submit_list_and_cancel(server):
+    status, payload = request(server, 'POST', '/api/jobs', {'urls': ['https://a/1', 'https://a/2']})
+    assert status == 201
+    first, second = (job['id'] for job in payload['jobs'])
+    status, payload = request(server, 'GET', '/api/jobs?state=pending')
+    assert status == 200 and [job['id'] for job in payload['jobs']] == [first, second]
+    assert request(server, 'POST', f'/api/jobs/{first}/cancel')[0] == 202
+    status, payload = request(server, 'DELETE', f'/api/jobs/{first}')
+    assert (status, payload['state']) == (409, JOB_CANCELLED) # 已結束的工作不能再取消
+    assert request(server, 'GET', f'/api/jobs/{second}')[1]['state'] == JOB_PENDING
+    assert request(server, 'GET', '/api/jobs/999')[0] == 404
+
+
+def test_requests_need_the_token(server):
+    assert request(server, 'GET', '/api/jobs', token=None)[0] == 401
+    assert request(server, 'GET', '/api/jobs', token='wrong')[0] == 401
+
+
+@pytest.mark.parametrize('body, headers, status', [
+    (b'not json', {}, 400),
+    (b'[1, 2]', {}, 400),
+    (b'{}', {'Content-Length': 'abc'}, 400),
+    (b'{}', {'Content-Length': '-1'}, 400),
+    (b'{}', {'Content-Length': str(2 * 1024 * 1024)}, 413),
+])
+def test_malformed_bodies_are_rejected(server, body, headers, status):
+    assert request(server, 'POST', '/api/jobs', body, headers=headers)[0] == status
+    assert server.queue.jobs == {}
+
+
+def test_unexpected_errors_answer_500(server, capsys):
+    server.queue.fail_snapshot = True
+    status, payload = request(server, 'GET', '/api/jobs')
+    assert status == 500 and 'snapshot exploded' in payload['error']
+    # 同一個伺服器仍可處理後續的請求
+    assert request(server, 'GET', '/api/options')[0] == 200
+
+
+def test_unknown_routes(server):
+    assert request(server, 'GET', '/nowhere')[0] == 404
+    assert request(server, 'POST', '/api/options')[0] == 405
@@ -0,0 +1,139 @@
+import time
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import BandwidthScheduler, MIN_JOB_RATE, parse_rate, parse_rate_schedule
+
+MIB = 1024 ** 2
+CHUNK = core.PROXY_CHUNK
+
+
+def local_time(hour, minute=0):
+    return time.struct_time((2026, 1, 1, hour, minute, 0, 3, 1, -1))
+
+
+def simulate(scheduler, clock, jobs, seconds, demand=None):
+    """模擬代理的轉送迴圈：每個工作送出一個區塊後等待 throttle() 回傳的秒數才送下一個
+
+    demand: 工作編號 -> 工作本身最多想要的速率 (bytes/s)，沒有列出的工作有多少份額就用多少。
+    回傳每個工作在這段時間內送出的位元組數。
+    """
+    demand = demand or {}
+    end = clock.now + seconds
+    ready = {job_id: clock.now for job_id in jobs}
+    sent = dict.fromkeys(jobs, 0)
+    while True:
+        job_id = min(ready, key=ready.get)
+        if ready[job_id] >= end:
+            return sent
+        clock.now = ready[job_id]
+        delay = scheduler.throttle(job_id, CHUNK)
+        sent[job_id] += CHUNK
+        if job_id in demand:
+            delay = max(delay, CHUNK / demand[job_id])
+        ready[job_id] = clock.now + delay
+
+
+@pytest.fixture
+def scheduler(clock):
+    scheduler = BandwidthScheduler()
+    scheduler.configure(8 * MIB)
+    return scheduler
+
+
+def test_unlimited_scheduler_never_delays(clock):
+    scheduler = BandwidthScheduler()
+    assert scheduler.admit(1)
+    assert scheduler.throttle(1, 10 * MIB) == 0
+    assert not scheduler.limited()
+
+
+def test_aggregate_rate_stays_under_the_cap(scheduler, clock):
+    jobs = list(range(8))
+    for job_id in jobs:
+        assert scheduler.admit(job_id)
+    sent = simulate(scheduler, clock, jobs, 10)
+    # 令牌桶最多累積 BANDWIDTH_BURST_SECONDS 的額度，每個工作最多再超出一個區塊
+    assert sum(sent.values()) <= 8 * MIB * (10 + core.BANDWIDTH_BURST_SECONDS) + len(jobs) * CHUNK
+    assert sum(sent.values()) >= 8 * MIB * 10 * 0.95
+    for job_bytes in sent.values():
+        assert job_bytes == pytest.approx(10 * MIB, rel=0.1)
+
+
+def test_shares_follow_jobs_starting_and_finishing(scheduler, clock):
+    # 先開始的工作不會一直佔著整個上限，最後剩下的工作也不會只拿到原本的一小份
+    assert scheduler.admit(0)
+    alone = simulate(scheduler, clock, [0], 5)
+    assert alone[0] == pytest.approx(5 * 8 * MIB, rel=0.05)
+
+    for job_id in range(1, 8):
+        assert scheduler.admit(job_id)
+    crowded = simulate(scheduler, clock, list(range(8)), 5)
+    for job_bytes in crowded.values():
+        assert job_bytes == pytest.approx(5 * MIB, rel=0.15)
+
+    for job_id in range(1, 8):
+        scheduler.release(job_id)
+    last = simulate(scheduler, clock, [0], 5)
+    assert last[0] == pytest.approx(5 * 8 * MIB, rel=0.05)
+
+
+def test_unused_share_goes_to_jobs_that_want_more(scheduler, clock):
+    # 只想要 1 MiB/s 的工作 (例如網站本身較慢) 讓出的頻寬由另一個工作使用
+    scheduler.admit('slow')
+    scheduler.admit('fast')
+    sent = simulate(scheduler, clock, ['slow', 'fast'], 10, demand={'slow': 1 * MIB})
+    assert sent['slow'] == pytest.approx(10 * MIB, rel=0.05)
+    assert sent['fast'] == pytest.approx(70 * MIB, rel=0.1)
+
+
+def test_admit_waits_when_the_share_would_drop_below_the_minimum(clock):
+    scheduler = BandwidthScheduler()
+    scheduler.configure(3 * MIN_JOB_RATE)
+    assert all(scheduler.admit(job_id) for job_id in range(3))
+    assert not scheduler.admit(3)
+    scheduler.release(0)
+    assert scheduler.admit(3)
+
+
+def test_schedule_overrides_the_default_rate():
+    scheduler = BandwidthScheduler()
+    scheduler.configure(5 * MIB, parse_rate_schedule('09:00-18:00=2M,22:00-06:00=0'))
+    assert scheduler.current_cap(local_time(12)) == 2 * MIB
+    assert scheduler.current_cap(local_time(23, 30)) is None # 跨越午夜的時段
+    assert scheduler.current_cap(local_time(5, 59)) is None
+    assert scheduler.current_cap(local_time(20)) == 5 * MIB
+    assert scheduler.limited()
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('5M', 5 * MIB),
+    ('500K', 500 * 1024),
+    ('1.5MiB', int(1.5 * MIB)),
+    ('2m/s', 2 * MIB),
+    ('0', None),
+    ('unlimited', None),
+])
+def test_parse_rate(text, expected):
+    assert parse_rate(text) == expected
+
+
+@pytest.mark.parametrize('text', ['fast', '5X', '-1M'])
+def test_parse_rate_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        parse_rate(text)
+
+
+def test_parse_rate_schedule():
+    assert parse_rate_schedule('09:00-18:00=2M, 22:30-06:00=0') == [
+        (9 * 60, 18 * 60, 2 * MIB),
+        (22 * 60 + 30, 6 * 60, None),
+    ]
+    assert parse_rate_schedule('') == []
+
+
+@pytest.mark.parametrize('text', ['9-18=2M', '09:00=2M', 'ab:cd-18:00=1M', '09:00-18:00=fast'])
+def test_parse_rate_schedule_rejects_bad_windows(text):
+    with pytest.raises(ValueError):
+        parse_rate_schedule(text)
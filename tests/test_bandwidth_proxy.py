@@ -0,0 +1,110 @@
+import base64
+import http.client
+import http.server
+import threading
+
+import pytest
+
+from youtube_spotify_downloader import BandwidthProxy, parse_proxy_job
+
+BODY = b'x' * 200_000
+
+
+class RecordingScheduler:
+    """記錄每個工作經過代理的位元組數，不節流"""
+
+    def __init__(self):
+        self.bytes = {}
+
+    def throttle(self, job_id, num_bytes):
+        self.bytes[job_id] = self.bytes.get(job_id, 0) + num_bytes
+        return 0.0
+
+
+class MediaHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def do_POST(self):
+        data = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data[::-1])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), MediaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def proxy():
+    proxy = BandwidthProxy(RecordingScheduler())
+    proxy.url(0) # 啟動代理
+    return proxy
+
+
+def authorization(job_id, token):
+    return 'Basic ' + base64.b64encode(f'{job_id}:{token}'.encode()).decode()
+
+
+def test_parse_proxy_job_requires_the_session_token():
+    assert parse_proxy_job(authorization(7, 'secret'), 'secret') == 7
+    assert parse_proxy_job(authorization(7, 'guess'), 'secret') is None
+    assert parse_proxy_job(authorization('x', 'secret'), 'secret') is None
+    assert parse_proxy_job('Bearer secret', 'secret') is None
+
+
+def test_each_session_uses_a_different_token():
+    first, second = BandwidthProxy(None), BandwidthProxy(None)
+    assert first.token != second.token and len(first.token) >= 16
+
+
+@pytest.mark.parametrize('token', [None, 'wrong'])
+def test_requests_without_the_token_are_refused(proxy, origin, token):
+    connection = http.client.HTTPConnection('127.0.0.1', proxy.port, timeout=5)
+    headers = {'Proxy-Authorization': authorization(3, token)} if token else {}
+    connection.request('GET', origin + '/video', headers=headers)
+    response = connection.getresponse()
+    assert response.status == 407
+    assert proxy.scheduler.bytes == {}
+
+
+def test_plain_http_keeps_the_client_connection_alive(proxy, origin):
+    connection = http.client.HTTPConnection('127.0.0.1', proxy.port, timeout=5)
+    headers = {'Proxy-Authorization': authorization(3, proxy.token)}
+    for _ in range(2):
+        connection.request('GET', origin + '/video', headers=headers)
+        response = connection.getresponse()
+        assert response.read() == BODY
+        assert not response.will_close
+    sock = connection.sock
+    connection.request('POST', origin + '/echo', body=b'abc', headers=headers)
+    response = connection.getresponse()
+    assert response.read() == b'cba'
+    assert connection.sock is sock # 三個請求都使用同一個用戶端連線
+    assert proxy.scheduler.bytes[3] >= 2 * len(BODY)
+    connection.close()
+
+
+def test_connect_tunnels_are_throttled_per_job(proxy, origin):
+    port = int(origin.rsplit(':', 1)[1])
+    connection = http.client.HTTPConnection('127.0.0.1', proxy.port, timeout=5)
+    connection.set_tunnel('127.0.0.1', port, headers={'Proxy-Authorization': authorization(9, proxy.token)})
+    connection.request('GET', '/video')
+    assert connection.getresponse().read() == BODY
+    assert proxy.scheduler.bytes[9] >= len(BODY)
+    connection.close()
@@ -0,0 +1,81 @@
+import collections
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import DiskSpaceGuard
+
+MIB = 1024 ** 2
+Usage = collections.namedtuple('Usage', 'total used free')
+
+
+@pytest.fixture
+def free_space(monkeypatch):
+    """把每個磁碟的可用空間固定為 free['bytes']"""
+    free = {'bytes': 100 * MIB}
+
+    def disk_usage(path):
+        if free['bytes'] is None:
+            raise OSError("offline")
+        return Usage(free['bytes'] * 2, free['bytes'], free['bytes'])
+
+    monkeypatch.setattr(core.shutil, 'disk_usage', disk_usage)
+    return free
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    staging = tmp_path / 'staging'
+    output = tmp_path / 'out' / 'not-created-yet'
+    staging.mkdir()
+    return str(staging), str(output)
+
+
+def test_reservations_count_against_later_jobs(free_space, dirs):
+    guard = DiskSpaceGuard(min_free=10 * MIB)
+    assert guard.reserve('a', 50 * MIB, 50 * MIB, *dirs) is None
+    assert guard.busy()
+    # 同一個磁碟只需要暫存區與輸出中較大的一份：100 - 10 (保留) - 50 (a) = 40 MiB
+    path, needed, available = guard.reserve('b', 45 * MIB, 45 * MIB, *dirs)
+    assert (needed, available) == (45 * MIB, 40 * MIB)
+    assert path == dirs[0]
+    guard.release('a')
+    assert guard.reserve('b', 45 * MIB, 45 * MIB, *dirs) is None
+
+
+def test_refused_jobs_do_not_hold_a_reservation(free_space, dirs):
+    guard = DiskSpaceGuard(min_free=0)
+    assert guard.reserve('big', 500 * MIB, 0, *dirs) is not None
+    assert not guard.busy()
+    assert guard.reserve('small', 60 * MIB, 0, *dirs) is None
+
+
+def test_force_reserves_even_when_short(free_space, dirs):
+    guard = DiskSpaceGuard(min_free=0)
+    assert guard.reserve('guess', 500 * MIB, 0, *dirs, force=True) is not None
+    assert guard.busy()
+    assert guard.reserve('next', 1 * MIB, 0, *dirs) is not None
+
+
+def test_adjust_only_checks_the_actual_free_space(free_space, dirs):
+    guard = DiskSpaceGuard(min_free=0)
+    guard.reserve('a', 60 * MIB, 0, *dirs)
+    guard.reserve('b', 30 * MIB, 0, *dirs)
+    # 已在執行的工作不再等待其他預留：80 MiB 放得下目前的可用空間
+    assert guard.adjust('b', 80 * MIB, 0, *dirs) is None
+    assert guard.adjust('b', 120 * MIB, 0, *dirs) == (dirs[0], 120 * MIB, 100 * MIB)
+    # 調整後的預留會影響之後的工作
+    assert guard.reserve('c', 1 * MIB, 0, *dirs) is not None
+
+
+def test_unknown_free_space_does_not_block(free_space, dirs):
+    free_space['bytes'] = None
+    guard = DiskSpaceGuard()
+    assert guard.reserve('a', 10 ** 15, 10 ** 15, *dirs) is None
+
+
+def test_get_filesystem_walks_up_to_an_existing_folder(tmp_path):
+    missing = tmp_path / 'a' / 'b' / 'c'
+    dev, path = core.get_filesystem(str(missing))
+    assert path == str(tmp_path)
+    assert dev == (tmp_path.stat().st_dev)
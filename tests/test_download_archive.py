@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from youtube_spotify_downloader import DownloadArchive, guess_media_key, parse_archive_line
+
+VIDEO = 'dQw4w9WgXcQ'
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = DownloadArchive(str(tmp_path / 'download_archive.sqlite3'))
+    yield archive
+    archive.close()
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    os.remove(path)
+    return lines
+
+
+@pytest.mark.parametrize('url, key', [
+    (f'https://www.youtube.com/watch?v={VIDEO}', ('youtube', VIDEO)),
+    (f'https://youtu.be/{VIDEO}', ('youtube', VIDEO)),
+    (f'https://music.youtube.com/watch?feature=share&v={VIDEO}', ('youtube', VIDEO)),
+    ('https://open.spotify.com/intl-de/track/4uLU6hMCjMI75M1A2tKUQC', ('spotify', '4uLU6hMCjMI75M1A2tKUQC')),
+    (f'https://www.youtube.com/watch?v={VIDEO}&list=PL123', None), # yt-dlp 會下載整個清單
+    ('https://open.spotify.com/album/1DFixLWuPkv3KT3TnV35m3', None),
+    ('https://vimeo.com/123', None),
+])
+def test_guess_media_key(url, key):
+    assert guess_media_key(url) == key
+
+
+@pytest.mark.parametrize('line, key', [
+    (f'youtube {VIDEO}\n', ('youtube', VIDEO)),
+    ('Vimeo 123', ('vimeo', '123')),
+    ('https://open.spotify.com/track/abc', ('spotify', 'abc')),
+    ('', None),
+    ('garbage', None),
+])
+def test_parse_archive_line(line, key):
+    assert parse_archive_line(line) == key
+
+
+def test_entries_are_kept_per_format(archive):
+    assert archive.add('youtube', VIDEO, 'MP3_AUDIO', url='https://youtu.be/x')
+    assert not archive.add('youtube', VIDEO, 'MP3_AUDIO') # 已存在
+    assert archive.contains('youtube', VIDEO, 'MP3_AUDIO')
+    assert not archive.contains('youtube', VIDEO, 'FLAC_LOSSLESS')
+    assert archive.add_many([('youtube', 'a'), ('youtube', VIDEO)], 'MP3_AUDIO') == 1
+    assert archive.entries('MP3_AUDIO') == [('youtube', 'a'), ('youtube', VIDEO)]
+
+
+def test_text_archives_round_trip(archive, tmp_path):
+    source = tmp_path / 'archive.txt'
+    source.write_text(f'youtube {VIDEO}\n\nhttps://open.spotify.com/track/abc\nbad\n', encoding='utf-8')
+    assert archive.import_text(str(source), 'MP3_AUDIO') == 2
+    assert archive.export_text(str(tmp_path / 'yt.txt'), 'MP3_AUDIO') == 2
+    assert read_lines(tmp_path / 'yt.txt') == ['spotify abc', f'youtube {VIDEO}']
+    archive.export_text(str(tmp_path / 'spotdl.txt'), 'MP3_AUDIO', tool='spotdl')
+    assert read_lines(tmp_path / 'spotdl.txt') == ['https://open.spotify.com/track/abc']
+
+
+def test_job_file_with_keys_lists_only_those_already_archived(archive):
+    archive.add_many([('youtube', 'a'), ('youtube', 'b'), ('youtube', 'c')], 'MP3_AUDIO')
+    path = archive.create_job_file('MP3_AUDIO', 'yt-dlp', keys=[('youtube', 'b'), ('youtube', 'new')])
+    assert read_lines(path) == ['youtube b']
+    path = archive.create_job_file('FLAC_LOSSLESS', 'yt-dlp', keys=[('youtube', 'b')])
+    assert read_lines(path) == []
+
+
+def test_shared_export_is_reused_until_the_archive_changes(archive, tmp_path):
+    archive.add('youtube', 'a', 'MP3_AUDIO')
+    assert read_lines(archive.create_job_file('MP3_AUDIO', 'yt-dlp')) == ['youtube a']
+    shared = tmp_path / 'download_archive-yt-dlp-MP3_AUDIO.txt'
+    assert shared.exists() # 放在下載紀錄旁邊，不在暫存資料夾
+    os.utime(shared, ns=(1, 1))
+    assert read_lines(archive.create_job_file('MP3_AUDIO', 'yt-dlp')) == ['youtube a']
+    assert shared.stat().st_mtime_ns == 1 # 紀錄沒有變動：沿用匯出檔
+    archive.add('youtube', 'b', 'MP3_AUDIO')
+    assert read_lines(archive.create_job_file('MP3_AUDIO', 'yt-dlp')) == ['youtube a', 'youtube b']
+    assert shared.stat().st_mtime_ns != 1
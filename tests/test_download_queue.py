@@ -0,0 +1,146 @@
+import threading
+import types
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import (
+    DownloadQueue, JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_PENDING, JOB_RUNNING, THROTTLE_MAX_RETRIES,
+)
+
+
+class FakeDownloads:
+    """取代 download_content：依網址決定行為，記錄呼叫次數與同時執行的工作數"""
+
+    def __init__(self):
+        self.calls = {}
+        self.running = 0
+        self.peak = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, url, format_key, quality_key, output_path, status_callback, current_lang, report=None,
+                 cancel_token=None, **kwargs):
+        with self._lock:
+            self.calls[url] = self.calls.get(url, 0) + 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            if 'block' in url:
+                # 等待測試放行或工作被取消 (真正的工具會在取消時被終止)
+                while not self.release.wait(0.01):
+                    if cancel_token.cancelled:
+                        return False
+            if 'crash' in url:
+                raise RuntimeError('tool exploded')
+            if 'throttled' in url:
+                report['throttled'] = True
+                return False
+            return True
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def downloads(monkeypatch, settings):
+    settings.update(disk_space_check=False, playlist_fanout=False)
+    fake = FakeDownloads()
+    monkeypatch.setattr(core, 'download_content', fake)
+    monkeypatch.setattr(core, 'get_transcode_pool', lambda: None)
+    monkeypatch.setattr(core, 'get_tool_registry',
+                        lambda: types.SimpleNamespace(resolve=lambda: {}, missing=lambda tool: None))
+    router = types.SimpleNamespace(route=lambda url: {'tool': None if 'invalid' in url else 'yt-dlp',
+                                                      'reason': 'invalid', 'extractor': None})
+    monkeypatch.setattr(core, 'get_url_router', lambda: router)
+    yield fake
+    fake.release.set()
+
+
+def submit(queue, *paths):
+    return queue.submit_many([(f'https://example.com/{path}', 'MP3_AUDIO', 'BEST_AUDIO', '/tmp/out', 'en')
+                              for path in paths])
+
+
+def test_worker_pool_bounds_concurrency(downloads):
+    queue = DownloadQueue(max_workers=2)
+    jobs = submit(queue, *(f'block{i}' for i in range(6)))
+    downloads.release.set()
+    assert queue.wait(10)
+    assert [job.state for job in jobs] == [JOB_DONE] * 6
+    assert downloads.peak <= 2
+    queue.shutdown()
+
+
+def test_duplicate_submissions_share_the_active_job(downloads):
+    queue = DownloadQueue(max_workers=1)
+    first, = submit(queue, 'block')
+    again, = submit(queue, 'block')
+    assert again is first
+    downloads.release.set()
+    assert queue.wait(10)
+    assert downloads.calls == {'https://example.com/block': 1}
+    queue.shutdown()
+
+
+def test_cancelling_a_pending_job_finishes_it_without_running(downloads):
+    queue = DownloadQueue(max_workers=1)
+    running, pending = submit(queue, 'block', 'later')
+    assert queue.cancel(pending)
+    assert pending.state == JOB_CANCELLED
+    downloads.release.set()
+    assert queue.wait(10)
+    assert running.state == JOB_DONE
+    assert 'https://example.com/later' not in downloads.calls
+    assert not queue.cancel(pending) # 已結束的工作不能再取消
+    queue.shutdown()
+
+
+def test_cancelling_a_running_job_stops_it(downloads):
+    queue = DownloadQueue(max_workers=1)
+    job, = submit(queue, 'block')
+    while job.state != JOB_RUNNING:
+        queue.wait(0.01)
+    assert queue.cancel(job)
+    assert queue.wait(10)
+    assert job.state == JOB_CANCELLED
+    assert queue.counts()[JOB_CANCELLED] == 1
+    queue.shutdown()
+
+
+def test_a_crashing_job_fails_alone(downloads):
+    queue = DownloadQueue(max_workers=1)
+    crashed, fine = submit(queue, 'crash', 'fine')
+    assert queue.wait(10)
+    assert (crashed.state, crashed.message) == (JOB_FAILED, 'tool exploded')
+    assert fine.state == JOB_DONE
+    queue.shutdown()
+
+
+def test_rejected_urls_fail_without_a_worker(downloads):
+    queue = DownloadQueue(max_workers=1)
+    job, = submit(queue, 'invalid')
+    assert job.state == JOB_FAILED
+    assert job.report['error'] == 'invalid'
+    assert queue.wait(1)
+    assert downloads.calls == {}
+    queue.shutdown()
+
+
+def test_throttled_jobs_are_retried_then_fail(downloads, settings):
+    settings['host_politeness'] = True
+    queue = DownloadQueue(max_workers=1)
+    job, = submit(queue, 'throttled')
+    assert queue.wait(10)
+    assert job.state == JOB_FAILED
+    assert job.report['retries'] == THROTTLE_MAX_RETRIES
+    assert downloads.calls[job.url] == THROTTLE_MAX_RETRIES + 1
+    queue.shutdown()
+
+
+def test_shutdown_refuses_new_jobs(downloads):
+    queue = DownloadQueue(max_workers=1)
+    queue.shutdown()
+    with pytest.raises(RuntimeError):
+        submit(queue, 'late')
+    assert queue.counts()[JOB_PENDING] == 0
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from youtube_spotify_downloader import CancelToken, FragmentTuner, JobCancelled, get_url_host
+
+URL = 'https://www.example.com/watch?v=1'
+OTHER = 'https://other.org/v/2'
+
+
+def run_job(tuner, url, rates):
+    """模擬一個工作：取得並行數，以該並行數的假吞吐量下載 10 秒後歸還"""
+    fragments = tuner.acquire(url)
+    tuner.release(url, fragments, rates[fragments] * 10, 10)
+    return fragments
+
+
+def test_get_url_host_groups_www_with_the_bare_domain():
+    assert get_url_host(URL) == get_url_host('https://example.com/x') == 'example.com'
+    assert get_url_host('not a url') == ''
+
+
+def test_levels_explore_neighbours_then_settle_on_the_fastest():
+    tuner = FragmentTuner(64, 64)
+    rates = {4: 1e6, 8: 3e6, 16: 2e6}
+    # 沒有量測資料時從預設值開始，再依序試探較高與較低的相鄰等級
+    assert [run_job(tuner, URL, rates) for _ in range(3)] == [8, 16, 4]
+    assert run_job(tuner, URL, rates) == 8
+    # 每 FRAGMENT_EXPLORE_EVERY 個工作重新試探一次相鄰等級
+    assert run_job(tuner, URL, rates) == 4
+    assert run_job(tuner, URL, rates) == 8
+
+
+def test_levels_above_the_budget_are_never_explored():
+    tuner = FragmentTuner(8, 8)
+    assert [run_job(tuner, URL, {4: 1e6, 8: 2e6}) for _ in range(3)] == [8, 4, 8]
+
+
+def test_short_and_failed_jobs_are_not_measured():
+    tuner = FragmentTuner(64, 64)
+    fragments = tuner.acquire(URL)
+    assert tuner.release(URL, fragments, 10 ** 6, 0.5) is None
+    fragments = tuner.acquire(URL)
+    assert tuner.release(URL, fragments, None, 30) is None
+    assert tuner.snapshot()['example.com']['mbps'] == {}
+
+
+def test_reduced_leases_count_towards_the_nearest_lower_level():
+    tuner = FragmentTuner(3, 3)
+    fragments = tuner.acquire(URL)
+    assert fragments == 3
+    assert tuner.release(URL, fragments, 3 * 10 ** 6, 10) == 3 * 10 ** 5
+    assert tuner.snapshot()['example.com']['mbps'] == {2: 0.3}
+
+
+def test_leases_never_exceed_the_global_budget():
+    tuner = FragmentTuner(10, 10)
+    first = tuner.acquire(URL)
+    second = tuner.acquire(OTHER)
+    assert (first, second) == (8, 2)
+    leases = []
+    thread = threading.Thread(target=lambda: leases.append(tuner.acquire(OTHER)))
+    thread.start()
+    thread.join(0.3)
+    assert thread.is_alive() # 預算用完：等待其他工作歸還連線
+    tuner.release(URL, first)
+    thread.join(5)
+    assert leases == [8]
+    assert tuner._in_use == 10
+
+
+def test_leases_never_exceed_the_host_budget():
+    tuner = FragmentTuner(100, 8)
+    assert tuner.acquire(URL) == 8
+    assert tuner.acquire(OTHER) == 8 # 其他主機不受影響
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(JobCancelled):
+        tuner.acquire(URL, token)
+    assert tuner.snapshot()['example.com']['in_use'] == 8
@@ -0,0 +1,73 @@
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import HostScheduler
+
+
+@pytest.fixture
+def scheduler(clock, settings, monkeypatch):
+    settings['host_max_jobs'] = 0
+    monkeypatch.setattr(core.random, 'uniform', lambda low, high: high) # 不加抖動，退避時間固定
+    return HostScheduler()
+
+
+def test_host_limit_applies_per_host(scheduler, settings):
+    settings['host_max_jobs'] = 2
+    assert scheduler.acquire(1, 'https://example.com/a')
+    assert scheduler.acquire(2, 'https://www.example.com/b')
+    assert not scheduler.acquire(3, 'https://example.com/c')
+    assert scheduler.acquire(4, 'https://other.org/d')
+    scheduler.release(1)
+    assert scheduler.acquire(3, 'https://example.com/c')
+
+
+def test_throttling_blocks_the_host_with_exponential_backoff(scheduler, clock):
+    url = 'https://example.com/v'
+    delay = scheduler.throttled(url)
+    assert delay == core.THROTTLE_BACKOFF_BASE
+    assert not scheduler.acquire(1, url)
+    assert scheduler.acquire(2, 'https://other.org/v') # 其他主機不受影響
+    # 同一波限流中其他工作的回報不再加倍
+    assert scheduler.throttled(url) == pytest.approx(delay)
+    clock.advance(delay)
+    assert scheduler.acquire(1, url)
+    scheduler.release(1)
+    assert scheduler.throttled(url) == 2 * core.THROTTLE_BACKOFF_BASE
+
+
+def test_backoff_is_capped(scheduler, clock):
+    url = 'https://example.com/v'
+    for _ in range(20):
+        delay = scheduler.throttled(url)
+        clock.advance(delay)
+    assert delay == core.THROTTLE_BACKOFF_MAX
+
+
+def test_concurrency_halves_and_recovers(scheduler, clock):
+    url = 'https://example.com/v'
+    for job_id in range(4):
+        assert scheduler.acquire(job_id, url)
+    delay = scheduler.throttled(url)
+    for job_id in range(4):
+        scheduler.release(job_id)
+    clock.advance(delay)
+    # 並行上限從 4 減半為 2
+    assert scheduler.acquire(10, url)
+    assert scheduler.acquire(11, url)
+    assert not scheduler.acquire(12, url)
+    # 每 THROTTLE_RECOVERY_SECONDS 秒沒有再被限流就加一，直到恢復原本的並行數後不再限制
+    clock.advance(core.THROTTLE_RECOVERY_SECONDS)
+    assert scheduler.acquire(12, url)
+    assert not scheduler.acquire(13, url)
+    clock.advance(core.THROTTLE_RECOVERY_SECONDS)
+    assert scheduler.acquire(13, url)
+    assert scheduler.acquire(14, url)
+    assert scheduler.snapshot()['example.com']['limit'] is None
+
+
+def test_blocked_for_reports_remaining_backoff(scheduler, clock):
+    url = 'https://example.com/v'
+    assert scheduler.blocked_for(url) == 0
+    scheduler.throttled(url)
+    clock.advance(1)
+    assert scheduler.blocked_for(url) == pytest.approx(core.THROTTLE_BACKOFF_BASE - 1)
@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from youtube_spotify_downloader import SIGNED_URL_SAFETY_SECONDS, InfoCache, get_signed_url_expiry, normalize_url
+
+URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+@pytest.fixture
+def cache(tmp_path, wall_clock):
+    return InfoCache(str(tmp_path / 'info'), ttl=3600, max_bytes=10_000)
+
+
+def info(title, stream_url='https://cdn.example.com/v.mp4'):
+    return {'id': 'dQw4w9WgXcQ', 'title': title, 'url': stream_url}
+
+
+def test_normalize_url_drops_tracking_and_uses_media_ids():
+    assert normalize_url(URL + '&si=abc') == normalize_url('https://youtu.be/dQw4w9WgXcQ') == 'youtube:dQw4w9WgXcQ'
+    assert normalize_url('https://WWW.Example.com/v/1/?b=2&utm_source=x&a=1') == 'https://example.com/v/1?a=1&b=2'
+
+
+def test_entries_expire_after_the_ttl(cache, wall_clock):
+    path = cache.put(URL, info('first'))
+    assert cache.get('https://youtu.be/dQw4w9WgXcQ') == path
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['title'] == 'first'
+    wall_clock.advance(3601)
+    assert cache.get(URL) is None
+    assert not os.path.exists(path)
+
+
+def test_signed_stream_urls_shorten_the_lifetime(cache, wall_clock):
+    expire = int(wall_clock.now) + 1000
+    signed = f'https://rr1.googlevideo.com/videoplayback?expire={expire}&sig=x'
+    assert get_signed_url_expiry(json.dumps(info('t', signed))) == expire
+    cache.put(URL, info('t', signed))
+    wall_clock.advance(1000 - SIGNED_URL_SAFETY_SECONDS - 1)
+    assert cache.get(URL) is not None
+    wall_clock.advance(2)
+    assert cache.get(URL) is None # 串流網址即將到期
+    # 已經 (或即將) 到期的資訊不寫入快取
+    assert cache.put(URL, info('t', signed)) is None
+
+
+def test_playlists_are_not_cached(cache):
+    assert cache.put('https://www.youtube.com/playlist?list=PL1', {'_type': 'playlist', 'entries': []}) is None
+
+
+def test_put_accepts_an_info_json_file(cache, tmp_path):
+    source = tmp_path / 'video.info.json'
+    source.write_text(json.dumps(info('from file')), encoding='utf-8')
+    with open(cache.put(URL, str(source)), encoding='utf-8') as f:
+        assert json.load(f)['title'] == 'from file'
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, wall_clock):
+    padding = 'x' * 400
+    cache = InfoCache(str(tmp_path / 'info'), ttl=3600, max_bytes=1000)
+    cache.put('https://example.com/a', info(padding))
+    wall_clock.advance(1)
+    cache.put('https://example.com/b', info(padding))
+    wall_clock.advance(1)
+    assert cache.get('https://example.com/a') # a 變成最近使用
+    wall_clock.advance(1)
+    cache.put('https://example.com/c', info(padding))
+    assert cache.get('https://example.com/a') and cache.get('https://example.com/c')
+    assert cache.get('https://example.com/b') is None
+
+
+def test_invalidate(cache):
+    cache.put(URL, info('t'))
+    cache.invalidate(URL)
+    assert cache.get(URL) is None
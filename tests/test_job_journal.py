@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import (
+    DownloadJob, JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_RUNNING, JobJournal, get_job_key, publish_file,
+    publish_staging_dir,
+)
+
+
+def make_job(path, state, output='/tmp/out'):
+    job = DownloadJob(f'https://example.com/{path}', 'MP3_AUDIO', 'BEST_AUDIO', output, 'en')
+    job.state = state
+    return job
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = JobJournal(str(tmp_path / 'jobs.sqlite3'))
+    yield journal
+    journal._conn.close()
+
+
+def test_job_keys_identify_the_same_work(tmp_path):
+    key = get_job_key('https://example.com/a', 'MP3_AUDIO', None, str(tmp_path))
+    assert key == get_job_key('https://example.com/a', 'MP3_AUDIO', '', str(tmp_path / '.'))
+    assert key != get_job_key('https://example.com/a', 'FLAC_LOSSLESS', None, str(tmp_path))
+
+
+def test_unfinished_lists_pending_and_running_jobs_in_order(journal, wall_clock):
+    first = make_job('first', JOB_RUNNING)
+    journal.record(first)
+    wall_clock.advance(1)
+    journal.record_many([make_job('second', core.JOB_PENDING), make_job('failed', JOB_FAILED)])
+    # 失敗的工作保留在日誌中，但不會被重新排入
+    assert journal.unfinished() == [
+        ('https://example.com/first', 'MP3_AUDIO', 'BEST_AUDIO', '/tmp/out', 'en'),
+        ('https://example.com/second', 'MP3_AUDIO', 'BEST_AUDIO', '/tmp/out', 'en'),
+    ]
+    assert journal._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 3
+
+
+def test_finished_jobs_are_removed(journal):
+    done, cancelled = make_job('done', JOB_RUNNING), make_job('cancelled', JOB_RUNNING)
+    journal.record_many([done, cancelled])
+    done.state, cancelled.state = JOB_DONE, JOB_CANCELLED
+    journal.record_many([done, cancelled])
+    assert journal.unfinished() == []
+    assert journal._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] == 0
+
+
+def test_journal_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    journal = JobJournal(path)
+    journal.record(make_job('interrupted', JOB_RUNNING))
+    journal._conn.close()
+    reopened = JobJournal(path)
+    assert [row[0] for row in reopened.unfinished()] == ['https://example.com/interrupted']
+    reopened._conn.close()
+
+
+def test_publish_file_moves_into_subfolders(tmp_path):
+    src = tmp_path / 'stage' / 'song.mp3'
+    src.parent.mkdir()
+    src.write_bytes(b'audio')
+    dest = publish_file(str(src), str(tmp_path / 'out'), os.path.join('album', 'song.mp3'))
+    assert open(dest, 'rb').read() == b'audio'
+    assert dest == str(tmp_path / 'out' / 'album' / 'song.mp3')
+    assert not src.exists()
+
+
+def test_publish_file_copies_across_devices(tmp_path, monkeypatch):
+    src = tmp_path / 'song.mp3'
+    src.write_bytes(b'audio')
+    real_replace = os.replace
+
+    def replace(a, b):
+        # 模擬跨磁碟：只有目的地資料夾內的改名成功
+        if os.path.dirname(a) != os.path.dirname(b):
+            raise OSError(18, 'Invalid cross-device link')
+        real_replace(a, b)
+
+    monkeypatch.setattr(core.os, 'replace', replace)
+    dest = publish_file(str(src), str(tmp_path / 'out'), 'song.mp3')
+    assert open(dest, 'rb').read() == b'audio'
+    assert not src.exists()
+    assert os.listdir(tmp_path / 'out') == ['song.mp3']
+
+
+def test_failed_copies_leave_no_partial_output(tmp_path, monkeypatch):
+    src = tmp_path / 'song.mp3'
+    src.write_bytes(b'audio')
+    monkeypatch.setattr(core.os, 'replace', lambda a, b: (_ for _ in ()).throw(OSError(18, 'cross-device')))
+    with pytest.raises(OSError):
+        publish_file(str(src), str(tmp_path / 'out'), 'song.mp3')
+    assert src.exists() # 來源保留，可在下次重試
+    assert os.listdir(tmp_path / 'out') == []
+
+
+def test_publish_staging_dir_skips_partial_files(tmp_path):
+    stage = tmp_path / 'stage'
+    (stage / 'album').mkdir(parents=True)
+    (stage / 'album' / 'a.mp3').write_bytes(b'a')
+    (stage / 'b.mp3.part').write_bytes(b'partial')
+    (stage / 'b.mp3.ytdl').write_bytes(b'state')
+    published = publish_staging_dir(str(stage), str(tmp_path / 'out'))
+    assert published == [str(tmp_path / 'out' / 'album' / 'a.mp3')]
+    assert not stage.exists()
+
+
+def test_publish_staging_dir_rejects_empty_outputs(tmp_path):
+    stage = tmp_path / 'stage'
+    stage.mkdir()
+    (stage / 'empty.mp3').write_bytes(b'')
+    with pytest.raises(OSError):
+        publish_staging_dir(str(stage), str(tmp_path / 'out'))
+    # 驗證失敗時保留暫存區，續傳時仍可使用
+    assert (stage / 'empty.mp3').exists()
+    assert not (tmp_path / 'out').exists()
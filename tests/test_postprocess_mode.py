@@ -0,0 +1,48 @@
+import pytest
+
+from youtube_spotify_downloader import (
+    FORMAT_OPTIONS, apply_postprocess_mode, choose_postprocess_mode, get_recode_target, get_stream_codecs,
+)
+
+
+def merged(vcodec, acodec):
+    return {'requested_formats': [{'vcodec': vcodec, 'acodec': 'none'}, {'vcodec': 'none', 'acodec': acodec}]}
+
+
+def test_codecs_come_from_the_merged_formats():
+    assert get_stream_codecs(merged('avc1.64001F', 'mp4a.40.2')) == ('avc1.64001F', 'mp4a.40.2')
+    assert get_stream_codecs({'vcodec': 'vp9', 'acodec': 'opus'}) == ('vp9', 'opus')
+    assert get_stream_codecs({'vcodec': 'vp9', 'acodec': 'none'}) == ('vp9', None)
+
+
+@pytest.mark.parametrize('info', [None, {}, {'_type': 'playlist'}, {'vcodec': 'none', 'acodec': 'opus'}])
+def test_unknown_codecs(info):
+    assert get_stream_codecs(info) is None
+
+
+@pytest.mark.parametrize('codecs, container, mode', [
+    (('avc1.64001F', 'mp4a.40.2'), 'mp4', 'remux'),
+    (('hvc1.1.6.L93', 'mp4a.40.2'), 'mov', 'remux'),
+    (('vp09.00.40.08', 'opus'), 'webm', 'remux'),
+    (('av01.0.08M.08', None), 'mp4', 'remux'), # 沒有音軌
+    (('vp9', 'opus'), 'mp4', 'recode'), # VP9/Opus 不能直接放入 MP4
+    (('avc1.64001F', 'opus'), 'mp4', 'recode'),
+    (('av01.0.08M.08', 'mp4a.40.2'), 'mov', 'recode'),
+    (('avc1.64001F', 'mp4a.40.2'), 'webm', 'recode'),
+    (('avc1.64001F', 'mp4a.40.2'), 'mkv', 'recode'), # 沒有列出的容器一律重新編碼
+    (None, 'mp4', 'recode'),
+])
+def test_choose_postprocess_mode(codecs, container, mode):
+    assert choose_postprocess_mode(codecs, container) == mode
+
+
+def test_remux_replaces_the_recode_arguments():
+    args = ['-o', 'x'] + FORMAT_OPTIONS['MP4_VIDEO'] + ['-f', 'best']
+    assert apply_postprocess_mode(args, 'mp4', 'remux') == [
+        '-o', 'x', '--remux-video', 'mp4', '--merge-output-format', 'mp4', '-f', 'best']
+    assert apply_postprocess_mode(args, 'mp4', 'recode') == args
+
+
+def test_recode_target_only_for_video_formats():
+    assert get_recode_target(FORMAT_OPTIONS['WEBM_VIDEO']) == 'webm'
+    assert get_recode_target(FORMAT_OPTIONS['MP3_AUDIO']) is None
@@ -0,0 +1,129 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from youtube_spotify_downloader import CancelToken, JobCancelled, get_process_loop, run_streaming_command
+
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+
+def test_lines_are_split_on_newlines_and_carriage_returns():
+    lines = []
+    code = ("import sys\n"
+            "sys.stdout.write('a\\r\\nb\\rc\\n\\n')\n"
+            "sys.stdout.flush()\n"
+            "sys.stdout.buffer.write('進度 50%'.encode('utf-8'))") # 最後一行沒有換行
+    assert run_streaming_command(python(code), on_line=lines.append) == 0
+    assert lines == ['a', 'b', 'c', '進度 50%']
+
+
+def test_multibyte_characters_split_across_reads():
+    lines = []
+    code = ("import sys, time\n"
+            "data = '下載完成'.encode('utf-8')\n"
+            "sys.stdout.buffer.write(data[:4]); sys.stdout.flush(); time.sleep(0.2)\n"
+            "sys.stdout.buffer.write(data[4:] + b'\\n')")
+    run_streaming_command(python(code), on_line=lines.append)
+    assert lines == ['下載完成']
+
+
+def test_stderr_goes_to_its_own_callback_and_the_error_tail():
+    warnings = []
+    code = ("import sys\n"
+            "for i in range(5): print('out', i)\n"
+            "for i in range(5): print('err', i, file=sys.stderr)\n"
+            "sys.exit(3)")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        run_streaming_command(python(code), tail_lines=2, on_error_line=warnings.append)
+    assert error.value.returncode == 3
+    assert error.value.output == 'out 3\nout 4'
+    assert error.value.stderr == 'err 3\nerr 4'
+    assert warnings == [f'err {i}' for i in range(5)]
+
+
+def test_missing_executables_raise_file_not_found(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        run_streaming_command([str(tmp_path / 'no-such-tool')])
+
+
+def test_cancel_terminates_the_child():
+    token = CancelToken()
+    started = time.monotonic()
+    code = "import time\nprint('ready', flush=True)\ntime.sleep(30)"
+    with pytest.raises(JobCancelled):
+        run_streaming_command(python(code), on_line=lambda line: token.cancel(), cancel_token=token)
+    assert time.monotonic() - started < 10
+
+
+def test_cancelled_tokens_never_start_a_child(tmp_path):
+    token = CancelToken()
+    token.cancel()
+    marker = tmp_path / 'ran'
+    with pytest.raises(JobCancelled):
+        run_streaming_command(python(f"open({str(marker)!r}, 'w')"), cancel_token=token)
+    assert not marker.exists()
+
+
+def test_silent_children_time_out(settings):
+    settings['stall_timeout'] = 0.5
+    code = "import time\nprint('starting', flush=True)\ntime.sleep(30)"
+    with pytest.raises(subprocess.TimeoutExpired) as error:
+        run_streaming_command(python(code))
+    assert error.value.output == 'starting'
+
+
+def test_steady_output_resets_the_stall_timer(settings):
+    settings['stall_timeout'] = 1.0
+    lines = []
+    code = "import time\nfor i in range(6):\n    print(i, flush=True)\n    time.sleep(0.3)"
+    assert run_streaming_command(python(code), on_line=lines.append) == 0
+    assert lines == [str(i) for i in range(6)]
+
+
+def test_failing_callbacks_stop_the_child():
+    def on_line(line):
+        raise ValueError('bad line')
+    started = time.monotonic()
+    with pytest.raises(ValueError):
+        run_streaming_command(python("import time\nprint('x', flush=True)\ntime.sleep(30)"), on_line=on_line)
+    assert time.monotonic() - started < 10
+
+
+def test_many_children_share_one_loop():
+    results = []
+    code = "import time\ntime.sleep(0.3)\nprint('done')"
+
+    def run():
+        lines = []
+        run_streaming_command(python(code), on_line=lines.append)
+        results.append(lines)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(20)
+    assert results == [['done']] * 8
+    assert get_process_loop() is get_process_loop()
+
+
+def test_run_refuses_to_block_the_loop_thread():
+    loop = get_process_loop()
+    errors = []
+    done = threading.Event()
+
+    def call():
+        try:
+            loop.run(python('pass'), lambda *args: None)
+        except RuntimeError as e:
+            errors.append(e)
+        done.set()
+
+    loop.loop.call_soon_threadsafe(call)
+    assert done.wait(5)
+    assert len(errors) == 1
@@ -0,0 +1,69 @@
+import pytest
+
+from youtube_spotify_downloader import ProgressParser, format_bytes, parse_eta, parse_size
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('10.00MiB', 10 * 1024 ** 2),
+    ('1.5 GiB', int(1.5 * 1024 ** 3)),
+    ('800KB', 800_000),
+    ('512B', 512),
+    ('n/a', None),
+])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+def test_parse_eta_accepts_minutes_and_hours():
+    assert parse_eta('00:05') == 5
+    assert parse_eta('01:02:03') == 3723
+
+
+def test_format_bytes():
+    assert format_bytes(None) == '0.0 B'
+    assert format_bytes(2 * 1024 ** 2) == '2.0 MiB'
+    assert format_bytes(3 * 1024 ** 4) == '3.0 TiB'
+
+
+def test_yt_dlp_progress_line():
+    event = ProgressParser('yt-dlp').feed('[download]  45.3% of ~  10.00MiB at    2.00MiB/s ETA 00:05 (frag 3/20)')
+    assert event == {
+        'tool': 'yt-dlp',
+        'percent': 45.3,
+        'total_bytes': 10 * 1024 ** 2,
+        'downloaded_bytes': int(10 * 1024 ** 2 * 0.453),
+        'speed': 2 * 1024 ** 2,
+        'eta': 5,
+    }
+
+
+def test_yt_dlp_finished_line_and_missing_fields():
+    parser = ProgressParser('yt-dlp')
+    done = parser.feed('[download] 100% of   10.00MiB in 00:00:05 at 2.00MiB/s')
+    assert (done['percent'], done['downloaded_bytes'], done['speed'], done['eta']) == (100.0, 10 * 1024 ** 2, 2 * 1024 ** 2, None)
+    unknown = parser.feed('[download]   3.0% at  Unknown B/s ETA Unknown')
+    assert (unknown['percent'], unknown['total_bytes'], unknown['downloaded_bytes']) == (3.0, None, None)
+
+
+@pytest.mark.parametrize('line', [
+    '[youtube] abc: Downloading webpage',
+    '[download] Destination: video.mp4',
+    '[Merger] Merging formats into "video.mkv"',
+    '',
+])
+def test_other_yt_dlp_lines_are_ignored(line):
+    assert ProgressParser('yt-dlp').feed(line) is None
+
+
+def test_spotdl_counts_finished_songs():
+    parser = ProgressParser('spotdl')
+    assert parser.feed('Processing query: https://open.spotify.com/album/x') is None
+    assert parser.feed('Found 4 songs in Album (Album)')['percent'] == 0.0
+    parser.feed('Downloaded "Artist - One": https://youtube.com/watch?v=1')
+    event = parser.feed('Skipping Artist - Two (file already exists)')
+    assert (event['items_done'], event['items_total'], event['percent']) == (2, 4, 50.0)
+
+
+def test_spotdl_without_a_song_count_has_no_percent():
+    event = ProgressParser('spotdl').feed('Downloaded "Artist - Song": https://youtube.com/watch?v=1')
+    assert (event['items_done'], event['items_total'], event['percent']) == (1, None, None)
@@ -0,0 +1,147 @@
+import os
+import threading
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import CancelToken, SourceCache, hash_file
+
+KEY = 'youtube:abc:137+140'
+
+
+def make_source(directory, files):
+    os.makedirs(directory, exist_ok=True)
+    for name, data in files.items():
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(data)
+    return str(directory)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SourceCache(str(tmp_path / 'cache'), max_bytes=1024)
+
+
+def test_put_and_get_round_trip(cache, tmp_path):
+    source = make_source(tmp_path / 'job1', {'video.mkv': b'v' * 100, 'video.mkv.part': b'partial'})
+    assert cache.put(KEY, source)
+    dest = tmp_path / 'job2'
+    assert cache.get(KEY, str(dest)) == ['video.mkv'] # 未完成的部分檔案不存入快取
+    assert (dest / 'video.mkv').read_bytes() == b'v' * 100
+    assert cache.get('youtube:other:18', str(tmp_path / 'job3')) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_bytes'], stats['entries']) == (1, 1, 100, 1)
+
+
+def test_has_media_matches_any_format_of_the_same_item(cache, tmp_path):
+    cache.put(KEY, make_source(tmp_path / 'job', {'a.webm': b'a'}))
+    assert cache.has_media('YouTube', 'abc')
+    assert not cache.has_media('youtube', 'ab')
+
+
+def test_published_copies_do_not_share_the_cached_object(cache, tmp_path):
+    # 存入後使用者修改 (會被發佈的) 原始檔案，快取中的內容不受影響
+    source = make_source(tmp_path / 'job', {'song.m4a': b'original'})
+    cache.put(KEY, source)
+    with open(os.path.join(source, 'song.m4a'), 'r+b') as f:
+        f.write(b'EDITED!!')
+    dest = tmp_path / 'again'
+    assert cache.get(KEY, str(dest)) == ['song.m4a']
+    assert (dest / 'song.m4a').read_bytes() == b'original'
+
+
+def test_corrupted_objects_are_dropped(cache, tmp_path):
+    cache.put(KEY, make_source(tmp_path / 'job', {'clip.mp4': b'x' * 50}))
+    object_path = cache._object_path(hash_file(str(tmp_path / 'job' / 'clip.mp4')))
+    with open(object_path, 'r+b') as f:
+        f.write(b'y') # 大小不變，只有內容 (與修改時間) 改變
+    os.utime(object_path, ns=(1, 1))
+    assert cache.get(KEY, str(tmp_path / 'dest')) is None
+    assert cache.stats()['entries'] == 0
+    assert not os.path.exists(object_path)
+
+
+
+def test_rehashing_does_not_block_other_cache_operations(cache, tmp_path, monkeypatch):
+    cache.put(KEY, make_source(tmp_path / 'job', {'clip.mp4': b'x' * 50}))
+    os.utime(cache._object_path(hash_file(str(tmp_path / 'job' / 'clip.mp4'))), ns=(1, 1))
+    hashing, finish = threading.Event(), threading.Event()
+
+    def slow_hash(path):
+        hashing.set()
+        finish.wait(5)
+        return hash_file(path)
+
+    monkeypatch.setattr(core, 'hash_file', slow_hash)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(cache.get(KEY, str(tmp_path / 'dest'))))
+    thread.start()
+    assert hashing.wait(5)
+    # 重新驗證大型物件檔期間，其他工作仍可查詢快取
+    assert cache.has_media('youtube', 'abc')
+    assert cache.stats()['entries'] == 1
+    assert thread.is_alive()
+    finish.set()
+    thread.join(5)
+    assert result == [['clip.mp4']]
+    # 驗證通過後記下新的修改時間，下次不必再計算雜湊
+    monkeypatch.setattr(core, 'hash_file', None)
+    assert cache.get(KEY, str(tmp_path / 'again')) == ['clip.mp4']
+
+def test_oversized_sources_are_not_cached(cache, tmp_path):
+    assert not cache.put(KEY, make_source(tmp_path / 'big', {'big.mkv': b'b' * 2048}))
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_sources_are_evicted(cache, tmp_path):
+    cache.put('site:1:f', make_source(tmp_path / '1', {'1.mkv': b'1' * 400}))
+    cache.put('site:2:f', make_source(tmp_path / '2', {'2.mkv': b'2' * 400}))
+    cache.get('site:1:f', str(tmp_path / 'use1')) # 1 比 2 更近期被使用
+    cache.put('site:3:f', make_source(tmp_path / '3', {'3.mkv': b'3' * 400}))
+    assert cache.get('site:2:f', str(tmp_path / 'd2')) is None
+    assert cache.get('site:1:f', str(tmp_path / 'd1')) == ['1.mkv']
+    assert cache.get('site:3:f', str(tmp_path / 'd3')) == ['3.mkv']
+    assert cache.stats()['evicted'] == 1
+
+
+def test_identical_content_is_stored_once(cache, tmp_path):
+    cache.put('site:1:a', make_source(tmp_path / '1', {'x.mkv': b'same' * 10}))
+    cache.put('site:1:b', make_source(tmp_path / '2', {'y.mkv': b'same' * 10}))
+    objects = [name for _, _, names in os.walk(cache.objects_dir) for name in names]
+    assert len(objects) == 1
+    cache.invalidate('site:1:a')
+    assert cache.get('site:1:b', str(tmp_path / 'd')) == ['y.mkv'] # 仍被參照的物件檔保留
+
+
+def test_claim_serializes_downloads_of_the_same_source(cache):
+    assert cache.claim(KEY)
+    acquired = threading.Event()
+
+    def waiter():
+        if cache.claim(KEY):
+            acquired.set()
+            cache.release(KEY)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(0.2)
+    cache.release(KEY)
+    thread.join(5)
+    assert acquired.is_set()
+    assert cache._claims == {}
+
+
+def test_cancelled_waiters_give_up_their_claim(cache):
+    assert cache.claim(KEY)
+    token = CancelToken()
+    token.cancel()
+    assert not cache.claim(KEY, token)
+    cache.release(KEY)
+    assert cache._claims == {}
+
+
+def test_index_persists_across_instances(tmp_path):
+    first = SourceCache(str(tmp_path / 'cache'), max_bytes=1024)
+    first.put(KEY, make_source(tmp_path / 'job', {'a.mkv': b'a' * 10}))
+    second = SourceCache(str(tmp_path / 'cache'), max_bytes=1024)
+    assert second.get(KEY, str(tmp_path / 'dest')) == ['a.mkv']
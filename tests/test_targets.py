@@ -0,0 +1,43 @@
+import pytest
+
+from youtube_spotify_downloader import join_targets, parse_targets, split_targets
+
+
+def test_single_format_uses_its_default_quality():
+    assert parse_targets('MP3_AUDIO') == [('MP3_AUDIO', 'BEST_AUDIO')]
+    assert parse_targets('MP4_VIDEO') == [('MP4_VIDEO', 'BEST_VIDEO')]
+
+
+def test_explicit_qualities_and_duplicates():
+    targets = parse_targets('MP4_VIDEO:HD_720P, MP3_AUDIO:HIGH_AUDIO,MP4_VIDEO:HD_720P')
+    assert targets == [('MP4_VIDEO', 'HD_720P'), ('MP3_AUDIO', 'HIGH_AUDIO')]
+
+
+def test_list_input_matches_comma_separated_input():
+    assert parse_targets(['MP4_VIDEO:HD_720P', 'FLAC_LOSSLESS']) == parse_targets('MP4_VIDEO:HD_720P,FLAC_LOSSLESS')
+
+
+def test_quality_key_only_applies_to_formats_of_the_same_kind():
+    # --quality HD_720P 只套用到視訊格式，音訊格式維持最佳品質
+    assert parse_targets('MP4_VIDEO,MP3_AUDIO', 'HD_720P') == [('MP4_VIDEO', 'HD_720P'), ('MP3_AUDIO', 'BEST_AUDIO')]
+    assert parse_targets('MP3_AUDIO,AAC_AUDIO', 'MEDIUM_AUDIO') == [
+        ('MP3_AUDIO', 'MEDIUM_AUDIO'), ('AAC_AUDIO', 'MEDIUM_AUDIO')]
+
+
+@pytest.mark.parametrize('specs, quality_key', [
+    ('OGG_AUDIO', None),            # 未知的格式
+    ('MP3_AUDIO:HD_720P', None),    # 視訊畫質不適用於音訊格式
+    ('MP4_VIDEO:BEST_AUDIO', None),
+    ('MP3_AUDIO', 'HD_720P'),       # --quality 沒有套用到任何格式
+    ('', None),
+    ([], None),
+])
+def test_invalid_targets_raise_value_error(specs, quality_key):
+    with pytest.raises(ValueError):
+        parse_targets(specs, quality_key)
+
+
+def test_join_and_split_round_trip():
+    targets = [('MP4_VIDEO', 'FHD_1080P'), ('MP3_AUDIO', 'BEST_AUDIO')]
+    assert split_targets(*join_targets(targets)) == targets
+    assert join_targets(targets[:1]) == ('MP4_VIDEO', 'FHD_1080P')
@@ -0,0 +1,125 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import ToolRegistry, parse_ffmpeg_list
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason='假工具是 shell 腳本')
+
+FFMPEG_SCRIPT = '''#!/bin/sh
+echo "$@" >> "$0.log"
+case "$*" in
+  *-version) echo "ffmpeg version 6.1.1 Copyright (c) 2000-2023" ;;
+  *-encoders) printf ' V..... = Video\\n ------\\n A....D libmp3lame  MP3\\n A....D aac          AAC\\n' ;;
+  *-muxers) printf ' D. = Demuxing\\n --\\n  E mp3             MP3\\n  E mp4,mov        MP4\\n' ;;
+esac
+'''
+
+YT_DLP_SCRIPT = '''#!/bin/sh
+echo "$@" >> "$0.log"
+case "$*" in
+  --version) echo 2024.08.06 ;;
+  --help) echo "  -x, --extract-audio   Convert  --audio-format FORMAT  (e.g. --no-audio-multistreams)" ;;
+esac
+'''
+
+
+def write_tool(folder, name, script):
+    path = folder / name
+    path.write_text(script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return path
+
+
+def probe_count(path):
+    log = f'{path}.log'
+    return len(open(log).read().splitlines()) if os.path.exists(log) else 0
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    folder = tmp_path / 'bin'
+    folder.mkdir()
+    monkeypatch.setattr(core, 'APPLICATION_PATH', str(folder))
+    monkeypatch.setattr(core.shutil, 'which', lambda name: None) # 只使用測試建立的工具
+    write_tool(folder, 'ffmpeg', FFMPEG_SCRIPT)
+    write_tool(folder, 'yt-dlp', YT_DLP_SCRIPT)
+    return folder
+
+
+def test_parse_ffmpeg_list():
+    text = ' V..... = Video\n ------\n A....D aac   AAC\n  E mp4,mov  MP4\n\n'
+    assert parse_ffmpeg_list(text) == ['aac', 'mov', 'mp4']
+
+
+def test_resolve_probes_versions_and_capabilities(tools, tmp_path):
+    registry = ToolRegistry(str(tmp_path / 'tools.json'))
+    found = registry.resolve()
+    assert found['spotdl'] is None
+    assert found['ffmpeg']['version'] == '6.1.1'
+    assert found['yt-dlp']['version'] == '2024.08.06'
+    assert registry.supports('yt-dlp', 'options', '--audio-format')
+    assert not registry.supports('yt-dlp', 'options', '--embed-chapters')
+    assert registry.supports('ffmpeg', 'encoders', 'libmp3lame')
+    assert registry.supports('ffmpeg', 'muxers', 'mov')
+    assert not registry.supports('ffmpeg', 'encoders', 'libopus')
+    assert not registry.supports('spotdl', 'options', '--output') # 工具不存在
+    assert registry.path('ffmpeg') == str(tools / 'ffmpeg')
+    assert registry.path('spotdl') == str(tools / 'spotdl') # 執行時才回報 FileNotFoundError
+
+
+def test_probe_results_are_cached_until_the_tool_changes(tools, tmp_path):
+    cache_path = str(tmp_path / 'tools.json')
+    ToolRegistry(cache_path).resolve()
+    probes = probe_count(tools / 'ffmpeg')
+    assert probes == 3 # 版本、編碼器與容器
+    assert set(json.load(open(cache_path))) == {'ffmpeg', 'yt-dlp'}
+    # 重新啟動：工具沒有變更時直接使用快取
+    assert ToolRegistry(cache_path).get('ffmpeg')['version'] == '6.1.1'
+    assert probe_count(tools / 'ffmpeg') == probes
+    # 工具更新後 (大小或修改時間不同) 重新探查
+    write_tool(tools, 'ffmpeg', FFMPEG_SCRIPT.replace('6.1.1', '7.0'))
+    assert ToolRegistry(cache_path).get('ffmpeg')['version'] == '7.0'
+    assert probe_count(tools / 'ffmpeg') == probes * 2
+
+
+def test_resolve_runs_once_per_registry(tools, tmp_path):
+    registry = ToolRegistry(str(tmp_path / 'tools.json'))
+    first = registry.resolve()
+    write_tool(tools, 'spotdl', YT_DLP_SCRIPT)
+    assert registry.resolve() is first and first['spotdl'] is None
+
+
+def test_unreadable_cache_and_failed_probes(tools, tmp_path):
+    cache_path = tmp_path / 'tools.json'
+    cache_path.write_text('{broken')
+    write_tool(tools, 'spotdl', '#!/bin/sh\nexit 1\n')
+    info = ToolRegistry(str(cache_path)).get('spotdl')
+    # 探查失敗的項目為 None，視為支援並交給工具本身回報錯誤
+    assert info['version'] is None and info['options'] is None
+    assert ToolRegistry(str(cache_path)).supports('spotdl', 'options', '--output')
+
+
+def test_missing_reports_the_first_absent_tool(tools, tmp_path, settings):
+    registry = ToolRegistry(str(tmp_path / 'tools.json'))
+    assert registry.missing('yt-dlp') is None
+    assert registry.missing('spotdl') == 'spotdl'
+    (tools / 'ffmpeg').unlink()
+    registry = ToolRegistry(str(tmp_path / 'tools.json'))
+    assert registry.missing('yt-dlp') == 'ffmpeg'
+    (tools / 'yt-dlp').unlink()
+    registry = ToolRegistry(str(tmp_path / 'tools.json'))
+    settings['engine'] = 'inprocess' # 行程內引擎不需要 yt-dlp 執行檔
+    assert registry.missing('yt-dlp') == 'ffmpeg'
+
+
+def test_bundled_tools_take_precedence_over_path(tools, tmp_path, monkeypatch):
+    monkeypatch.setattr(core.shutil, 'which', lambda name: sys.executable)
+    registry = ToolRegistry(str(tmp_path / 'tools.json'))
+    registry.resolve()
+    assert registry.path('ffmpeg') == str(tools / 'ffmpeg')
+    assert registry.path('spotdl') == sys.executable
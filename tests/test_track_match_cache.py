@@ -0,0 +1,55 @@
+import sqlite3
+
+import pytest
+
+from youtube_spotify_downloader import TrackMatchCache
+
+ALBUM = 'https://open.spotify.com/album/abc'
+
+
+def song(track_id, download_url=None):
+    return {'song_id': track_id, 'name': f'Song {track_id}', 'download_url': download_url}
+
+
+@pytest.fixture
+def cache(tmp_path, wall_clock):
+    return TrackMatchCache(str(tmp_path / 'tracks.sqlite3'), ttl=3600)
+
+
+def test_songs_come_back_in_the_requested_order(cache):
+    cache.put_songs([song('a', 'https://youtu.be/a'), song('b', 'https://youtu.be/b'), {'name': 'no id'}])
+    songs = cache.get_songs(['b', 'missing', 'a'])
+    assert [(s['song_id'], s['download_url']) for s in songs] == [('b', 'https://youtu.be/b'), ('a', 'https://youtu.be/a')]
+    assert cache.get_songs([]) == []
+
+
+def test_expired_matches_are_returned_without_download_url(cache, wall_clock):
+    cache.put_songs([song('a', 'https://youtu.be/a')])
+    wall_clock.advance(3601)
+    assert cache.get_songs(['a']) == [song('a')]
+
+
+def test_songs_without_a_match_keep_the_previous_one(cache, wall_clock):
+    cache.put_songs([song('a', 'https://youtu.be/a')])
+    wall_clock.advance(10)
+    cache.put_songs([dict(song('a'), name='Renamed')])
+    [cached] = cache.get_songs(['a'])
+    assert (cached['name'], cached['download_url']) == ('Renamed', 'https://youtu.be/a')
+    cache.forget_matches(['a'])
+    assert cache.get_songs(['a'])[0]['download_url'] is None
+
+
+def test_large_playlists_stay_under_the_sqlite_variable_limit(cache):
+    # 模擬 SQLite 3.32 之前的 999 個參數上限
+    cache._conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    track_ids = [f'track{i}' for i in range(2500)]
+    cache.put_songs([song(track_id, f'https://youtu.be/{track_id}') for track_id in track_ids])
+    songs = cache.get_songs(track_ids)
+    assert [s['song_id'] for s in songs] == track_ids
+
+
+def test_collections_expire_after_their_ttl(cache, wall_clock):
+    cache.put_collection(ALBUM, ['a', 'b'], ttl=60)
+    assert cache.get_collection(ALBUM + '?si=share') == ['a', 'b'] # 分享參數不影響鍵
+    wall_clock.advance(61)
+    assert cache.get_collection(ALBUM) is None
@@ -0,0 +1,115 @@
+import os
+import threading
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import (
+    TranscodePool, get_transcode_plan, get_transcode_pool, strip_transcode_args, transcode_staging_dir,
+)
+
+
+def wait_for(predicate, timeout=5):
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return True
+        event.wait(0.01)
+    return predicate()
+
+
+def test_submit_blocks_when_the_queue_is_full():
+    pool = TranscodePool(1, 2)
+    gate = threading.Event()
+    done = []
+    pool.submit(gate.wait) # 佔住唯一的執行緒
+    assert wait_for(lambda: pool.snapshot()['running'] == 1)
+    pool.submit(lambda: done.append(1))
+    pool.submit(lambda: done.append(2))
+    submitter = threading.Thread(target=pool.submit, args=(lambda: done.append(3),))
+    submitter.start()
+    submitter.join(0.2)
+    assert submitter.is_alive() # 背壓：佇列已滿時下載執行緒在此等待
+    assert pool.snapshot() == {'queued': 2, 'running': 1, 'workers': 1}
+    gate.set()
+    submitter.join(5)
+    assert wait_for(lambda: done == [1, 2, 3])
+
+
+def test_workers_run_tasks_in_parallel():
+    pool = TranscodePool(3, 3)
+    barrier = threading.Barrier(3, timeout=5)
+    finished = []
+    for _ in range(3):
+        pool.submit(lambda: finished.append(barrier.wait()))
+    assert wait_for(lambda: len(finished) == 3)
+
+
+def test_a_failing_task_does_not_stop_its_worker():
+    pool = TranscodePool(1, 1)
+    done = threading.Event()
+    pool.submit(lambda: 1 / 0)
+    pool.submit(done.set)
+    assert done.wait(5)
+    assert wait_for(lambda: pool.snapshot()['running'] == 0)
+
+
+def test_get_transcode_pool_follows_settings(settings, monkeypatch):
+    monkeypatch.setattr(core, '_transcode_pool', None)
+    settings['transcode_workers'] = 0
+    assert get_transcode_pool() is None # 在下載工作內轉檔
+    settings['transcode_workers'] = 2
+    pool = get_transcode_pool()
+    assert (pool.workers, pool.max_queued) == (2, 2 * core.TRANSCODE_QUEUE_PER_WORKER)
+    assert get_transcode_pool() is pool
+
+
+def test_audio_plans_map_quality_onto_the_encoder_scale():
+    assert get_transcode_plan('MP3_AUDIO', 'BEST_AUDIO')['args'] == ['-vn', '-c:a', 'libmp3lame', '-q:a', '0']
+    assert get_transcode_plan('MP3_AUDIO', 'MEDIUM_AUDIO')['args'][-1] == '5'
+    # AAC 的 -q:a 數值越大品質越好
+    assert get_transcode_plan('AAC_AUDIO', 'BEST_AUDIO')['args'][-1] == '4'
+    flac = get_transcode_plan('FLAC_LOSSLESS', 'BEST_AUDIO')
+    assert (flac['muxer'], flac['args']) == ('flac', ['-vn', '-c:a', 'flac'])
+
+
+def test_video_plans_only_for_recodes():
+    assert get_transcode_plan('MP4_VIDEO', 'BEST_VIDEO', 'remux') is None
+    plan = get_transcode_plan('WEBM_VIDEO', 'BEST_VIDEO', 'recode')
+    assert (plan['kind'], plan['ext'], plan['muxer']) == ('video', 'webm', 'webm')
+
+
+def test_strip_transcode_args_leaves_only_the_download():
+    args = ['-x', '--audio-format', 'mp3', '--audio-quality', '0', '-o', 'x']
+    assert strip_transcode_args(args) == ['-o', 'x', '-f', 'bestaudio/best']
+    assert strip_transcode_args(['--recode-video', 'mp4', '-o', 'x']) == ['-o', 'x']
+
+
+def fake_ffmpeg(calls):
+    def run(cmd, cancel_token=None, **kwargs):
+        calls.append(cmd)
+        with open(cmd[-1], 'wb') as f: # 最後一個參數是輸出的暫存檔
+            f.write(b'converted')
+    return run
+
+
+def test_transcode_staging_dir_replaces_sources(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(core, 'run_streaming_command', fake_ffmpeg(calls))
+    (tmp_path / 'a.webm').write_bytes(b'opus')
+    (tmp_path / 'b.mp3').write_bytes(b'done') # 中斷前已轉換過
+    (tmp_path / 'c.webm.part').write_bytes(b'partial')
+    plan = get_transcode_plan('MP3_AUDIO', 'BEST_AUDIO')
+    assert transcode_staging_dir(str(tmp_path), plan, 'ffmpeg') == 1
+    assert sorted(os.listdir(tmp_path)) == ['a.mp3', 'b.mp3', 'c.webm.part']
+    assert calls[0][calls[0].index('-i') + 1] == str(tmp_path / 'a.webm')
+
+
+def test_transcode_staging_dir_keeps_sources_for_other_targets(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, 'run_streaming_command', fake_ffmpeg([]))
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'a.webm').write_bytes(b'opus')
+    (source / 'b.flac').write_bytes(b'flac')
+    plan = get_transcode_plan('FLAC_LOSSLESS', 'BEST_AUDIO')
+    assert transcode_staging_dir(str(source), plan, 'ffmpeg', target_dir=str(tmp_path / 'flac')) == 1
+    assert sorted(os.listdir(source)) == ['a.webm', 'b.flac']
+    assert sorted(os.listdir(tmp_path / 'flac')) == ['a.flac', 'b.flac']
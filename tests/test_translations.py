@@ -0,0 +1,79 @@
+import json
+import threading
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import LANG_DATA, LANGUAGE_NAMES, LazyTranslations, detect_system_language, get_texts
+
+
+@pytest.fixture
+def locales(tmp_path, monkeypatch):
+    for lang in ('en', 'ja'):
+        (tmp_path / f'{lang}.json').write_text(json.dumps({'title': lang}), encoding='utf-8')
+    monkeypatch.setattr(core, 'LOCALES_PATH', str(tmp_path))
+    return tmp_path
+
+
+def test_languages_are_loaded_on_first_use(locales):
+    translations = LazyTranslations({'en': 'English', 'ja': '日本語'})
+    assert list(translations) == ['en', 'ja'] and len(translations) == 2
+    assert translations.loaded() == [] # 列出語言不需要讀取任何檔案
+    assert translations['ja'] == {'title': 'ja'}
+    assert translations.loaded() == ['ja']
+    (locales / 'ja.json').unlink()
+    assert translations['ja']['title'] == 'ja' # 載入後保留在記憶體中
+
+
+def test_unknown_languages_are_missing(locales):
+    translations = LazyTranslations({'en': 'English'})
+    with pytest.raises(KeyError):
+        translations['xx']
+    assert translations.get('xx') is None
+    assert 'xx' not in translations
+
+
+def test_concurrent_lookups_load_once(locales, monkeypatch):
+    translations = LazyTranslations({'en': 'English'})
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(core.json, 'load', lambda f: loads.append(1) or real_load(f))
+    threads = [threading.Thread(target=lambda: translations['en']) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [1]
+
+
+def test_get_texts_falls_back_to_english(locales, monkeypatch):
+    monkeypatch.setattr(core, 'LANG_DATA', LazyTranslations({'en': 'English', 'ja': '日本語'}))
+    assert get_texts('ja')['title'] == 'ja'
+    assert get_texts('xx')['title'] == 'en'
+    assert get_texts(None)['title'] == 'en'
+    assert core.LANG_DATA.loaded() == ['ja', 'en']
+
+
+def test_every_locale_has_the_english_keys():
+    english = set(LANG_DATA['en'])
+    for lang in LANGUAGE_NAMES:
+        assert english <= set(LANG_DATA[lang]), lang
+
+
+@pytest.mark.parametrize('system, expected', [
+    ('zh_CN', 'zh_CN'),
+    ('ja_JP', 'ja'),
+    ('zh_HK', 'zh_TW'), # 沒有對應翻譯的中文地區使用繁體中文
+    ('xx_YY', 'zh_TW'),
+    (None, 'zh_TW'),
+])
+def test_detect_system_language(monkeypatch, system, expected):
+    monkeypatch.setattr(core.locale, 'getdefaultlocale', lambda: (system, 'UTF-8'))
+    assert detect_system_language() == expected
+
+
+def test_detect_system_language_ignores_unparsable_locales(monkeypatch):
+    def broken():
+        raise ValueError('unknown locale: UTF-8')
+    monkeypatch.setattr(core.locale, 'getdefaultlocale', broken)
+    assert detect_system_language() == 'zh_TW'
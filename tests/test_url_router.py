@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import UrlRouter
+
+SITES = """\
+yt-dlp:
+youtube
+youtube:tab
+vimeo
+20min (CURRENTLY BROKEN)
+example.com
+
+spotdl:
+spotify
+"""
+
+PATTERNS = {
+    'youtube': ([r'https?://(?:www\.|m\.)?youtube\.com/watch\?v=(?P<id>[\w-]+)', r'https?://youtu\.be/(?P<id>[\w-]+)'], True),
+    'vimeo': ([r'https?://(?:www\.)?vimeo\.com/(?P<id>\d+)'], True),
+    'oldsite': ([r'https?://(?:www\.)?oldsite\.net/v/(?P<id>\d+)'], False),
+    'anything': ([r'https?://[^/]+/embed/(?P<id>\d+)'], True),
+}
+
+
+@pytest.fixture
+def sites_path(tmp_path):
+    path = tmp_path / 'Downloadable_videos.txt'
+    path.write_text(SITES, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def label_router(sites_path, settings, monkeypatch):
+    """沒有安裝 yt_dlp：只依支援網站清單的網域與網站標籤路由"""
+    settings['reject_unknown_sites'] = False
+    monkeypatch.setattr(core, 'load_yt_dlp_patterns', lambda: None)
+    return UrlRouter.build(sites_path)
+
+
+@pytest.fixture
+def pattern_router(sites_path, settings, monkeypatch):
+    settings['reject_unknown_sites'] = False
+    monkeypatch.setattr(core, 'load_yt_dlp_patterns', lambda: PATTERNS)
+    return UrlRouter.build(sites_path)
+
+
+def test_spotify_goes_to_spotdl(label_router):
+    route = label_router.route('https://open.spotify.com/track/abc123')
+    assert route == {'tool': 'spotdl', 'extractor': 'Spotify', 'reason': None}
+
+
+@pytest.mark.parametrize('url', ['not a url', 'ftp://youtube.com/x', 'https://localhost/x', 'http://[::1/'])
+def test_invalid_urls_are_rejected(label_router, url):
+    assert label_router.route(url)['reason'] == 'invalid'
+
+
+def test_labels_and_domains_from_the_site_list(label_router):
+    assert label_router.route('https://www.youtube.com/watch?v=x')['extractor'] == 'youtube'
+    assert label_router.route('https://player.vimeo.com/video/1')['extractor'] == 'vimeo'
+    assert label_router.route('https://sub.example.com/v/1')['extractor'] == 'example.com'
+
+
+def test_broken_extractor_is_rejected(label_router):
+    assert label_router.route('https://www.20min.ch/video/1') == {'tool': None, 'extractor': '20min', 'reason': 'broken'}
+
+
+def test_unknown_sites_follow_the_setting(label_router, settings):
+    assert label_router.route('https://unknown-site.org/v/1') == {'tool': 'yt-dlp', 'extractor': 'generic', 'reason': None}
+    settings['reject_unknown_sites'] = True
+    assert label_router.route('https://unknown-site.org/v/1')['reason'] == 'unsupported'
+
+
+def test_url_patterns_confirm_candidates(pattern_router):
+    assert pattern_router.route('https://youtu.be/abc')['extractor'] == 'youtube'
+    assert pattern_router.route('https://vimeo.com/123')['extractor'] == 'vimeo'
+    # 網域相符但網址規則不符：改比對無法建立索引的規則，都不符時當作未知網站
+    assert pattern_router.route('https://vimeo.com/about')['extractor'] == 'generic'
+    assert pattern_router.route('https://some.host/embed/42')['extractor'] == 'anything'
+
+
+def test_extractors_marked_not_working_by_yt_dlp_are_broken(pattern_router):
+    assert pattern_router.route('https://oldsite.net/v/1')['reason'] == 'broken'
+    assert 'oldsite' in pattern_router.index['broken']
+
+
+def test_index_survives_a_json_round_trip(pattern_router):
+    router = UrlRouter(json.loads(json.dumps(pattern_router.index)))
+    assert router.route('https://youtu.be/abc') == pattern_router.route('https://youtu.be/abc')
@@ -0,0 +1,93 @@
+import sys
+import types
+
+import pytest
+
+import youtube_spotify_downloader as core
+from youtube_spotify_downloader import YoutubeDLPool, split_job_options
+
+
+class FakeYoutubeDL:
+    """記錄建立與關閉次數的 YoutubeDL 替身"""
+
+    created = []
+
+    def __init__(self, params):
+        self.params = dict(params)
+        self.archive = set()
+        self.closed = False
+        self.downloads = []
+        FakeYoutubeDL.created.append(self)
+
+    def add_progress_hook(self, hook):
+        pass
+
+    def download(self, urls):
+        self.downloads.append((urls, dict(self.params['outtmpl']), self.params['concurrent_fragment_downloads']))
+        return 0
+
+    def close(self):
+        self.closed = True
+
+
+def fake_parse_options(args):
+    # 只模擬用到的選項：-o [TYPE:]TEMPLATE、-N 與 --download-archive
+    opts = {'outtmpl': {}, 'concurrent_fragment_downloads': 1, 'download_archive': None}
+    for name, value in zip(args, args[1:]):
+        if name == '-o':
+            kind, _, template = value.rpartition(':')
+            opts['outtmpl'][kind or 'default'] = template
+        elif name == '-N':
+            opts['concurrent_fragment_downloads'] = int(value)
+        elif name == '--download-archive':
+            opts['download_archive'] = value
+    if not opts['outtmpl']:
+        opts['outtmpl'] = {'default': '%(title)s.%(ext)s'}
+    return types.SimpleNamespace(ydl_opts=opts)
+
+
+@pytest.fixture
+def fake_yt_dlp(monkeypatch):
+    FakeYoutubeDL.created = []
+    module = types.SimpleNamespace(YoutubeDL=FakeYoutubeDL, parse_options=fake_parse_options)
+    monkeypatch.setitem(sys.modules, 'yt_dlp', module)
+    monkeypatch.setattr(core, 'YOUTUBEDL_POOL', YoutubeDLPool())
+    return module
+
+
+def test_split_job_options_keeps_only_shared_arguments():
+    shared, job = split_job_options(['--ffmpeg-location', 'ff', '-N', '4', '-o', '/a/%(title)s', '-x',
+                                     '--download-archive', 'archive.txt'])
+    assert shared == ['--ffmpeg-location', 'ff', '-x']
+    assert job == ['-N', '4', '-o', '/a/%(title)s', '--download-archive', 'archive.txt']
+
+
+def test_jobs_with_different_outputs_reuse_one_instance(fake_yt_dlp):
+    core.run_yt_dlp_inprocess(['-x', '-N', '4', '-o', '/stage/1/%(title)s'], 'https://example.com/1')
+    core.run_yt_dlp_inprocess(['-x', '-N', '8', '-o', '/stage/2/%(title)s', '-o', 'infojson:/info/%(id)s'],
+                              'https://example.com/2')
+    assert len(FakeYoutubeDL.created) == 1
+    ydl = FakeYoutubeDL.created[0]
+    first, second = ydl.downloads
+    assert first[1]['default'] == '/stage/1/%(title)s' and first[2] == 4
+    assert second[1] == {'default': '/stage/2/%(title)s', 'infojson': '/info/%(id)s'} and second[2] == 8
+    # 歸還後還原實例原本的設定，下一個工作不會沿用上一個工作的輸出位置
+    assert ydl.params['outtmpl'] == {'default': '%(title)s.%(ext)s'}
+    assert ydl.params['concurrent_fragment_downloads'] == 1
+
+
+def test_idle_instances_are_capped_per_key_and_in_total(fake_yt_dlp):
+    pool = YoutubeDLPool(max_idle=2, max_idle_total=3)
+    handles = [pool.acquire(['-f', 'a']) for _ in range(3)]
+    for handle in handles:
+        pool.release(handle)
+    assert handles[0]['ydl'].closed # 同一組參數超過上限時關閉最舊的
+    others = [pool.acquire(['-f', key]) for key in ('b', 'c')]
+    for handle in others:
+        pool.release(handle)
+    # 總數上限：關閉最久沒有使用的實例
+    assert handles[1]['ydl'].closed and handles[2]['ydl'].closed is False
+    assert pool.acquire(['-f', 'a']) is handles[2]
+    assert pool.acquire(['-f', 'c']) is others[1]
+    pool.close()
+    assert others[0]['ydl'].closed